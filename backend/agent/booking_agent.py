@@ -5,61 +5,214 @@ LangGraph-based booking agent for calendar appointments.
 import os
 import re
 import json
+import asyncio
+import logging
+from itertools import islice
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-import pytz
+from typing import Dict, List, Any, Optional, AsyncIterator, Iterator
+from cachetools import TTLCache
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 from langchain_openai import ChatOpenAI
+from langchain_core.globals import set_llm_cache
+from langchain_community.cache import SQLiteCache
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 
+from backend.config import settings
 from backend.models.schemas import AgentState
-from backend.calendar.google_calendar import GoogleCalendarService
+from backend.agent.llm_batcher import LLMBatcher
+from backend.agent.simple_agent import FastIntentClassifier
+from backend.calendar.free_slots import FreeSlotFinder
+from backend.calendar.google_calendar import GoogleCalendarService, close_http_client, parse_api_datetime
+
+logger = logging.getLogger(__name__)
+
+# Fallback extraction patterns, compiled once at import (checked in order)
+_DATE_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'tomorrow',
+    r'today',
+    r'next week',
+    r'this week',
+    r'(monday|tuesday|wednesday|thursday|friday|saturday|sunday)',
+    r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}',
+    r'(january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{1,2}'
+))
+_TIME_RE = re.compile(r'\d{1,2}:\d{2}\s*(am|pm)?|\d{1,2}\s*(am|pm)')
+_DURATION_RE = re.compile(r'(\d+)\s*(hour|hr|minute|min)')
+
+_WEEKDAY_IDX = {
+    'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
+    'friday': 4, 'saturday': 5, 'sunday': 6
+}
+
+# Calendar data fetched for a conversation is reused for this long (like the
+# calendar service's per-day busy cache), so outside changes show up within a minute
+_CALENDAR_CACHE_TTL_SECONDS = 60
+_AVAILABILITY_CACHE_SIZE = 4096
+
+# Number of slots offered to the user per availability check
+_SLOTS_TO_OFFER = 3
+
+# Intents whose reply is templated by _generate_response rather than drafted by the LLM
+_TEMPLATED_INTENTS = ('greeting', 'book_meeting', 'check_availability', 'confirm_booking')
+# User messages included in the turn prompt
+_PROMPT_USER_MESSAGES = 3
+
+# Structured-output schema for the fused turn completion (key order = generation order)
+_NULLABLE_STRING = {"type": ["string", "null"]}
+_TURN_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "intent": {
+            "type": "string",
+            "enum": ["greeting", "book_meeting", "check_availability", "confirm_booking",
+                     "modify_booking", "cancel_booking", "other"]
+        },
+        "extracted": {
+            "type": "object",
+            "properties": {
+                "date": _NULLABLE_STRING,
+                "time": _NULLABLE_STRING,
+                "duration": {"type": ["integer", "null"]},
+                "title": _NULLABLE_STRING,
+                "description": _NULLABLE_STRING,
+                "attendee_email": _NULLABLE_STRING
+            },
+            "required": ["date", "time", "duration", "title", "description", "attendee_email"],
+            "additionalProperties": False
+        },
+        "reply": {"type": "string"}
+    },
+    "required": ["intent", "extracted", "reply"],
+    "additionalProperties": False
+}
+
+# Intents the keyword classifier may settle without an LLM call
+_FAST_INTENTS = ('greeting', 'confirm_booking')
+_INTENT_FIELD_RE = re.compile(r'"intent"\s*:\s*"([^"]*)"')
+_REPLY_FIELD_RE = re.compile(r'"reply"\s*:\s*"')
+
+
+def _recent(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The newest messages, bounded so every checkpoint write stays constant-size."""
+    return messages[-settings.MAX_CONVERSATION_HISTORY:]
+
+
+class _ReplyStreamer:
+    """Incrementally decodes the "reply" string out of a streamed JSON completion."""
+    
+    def __init__(self):
+        self.buffer = ""
+        self.emitted = 0
+    
+    @property
+    def intent(self) -> Optional[str]:
+        match = _INTENT_FIELD_RE.search(self.buffer)
+        return match.group(1).strip().lower() if match else None
+    
+    def feed(self, chunk: str) -> str:
+        """Add a chunk of raw JSON and return any newly decodable reply text."""
+        self.buffer += chunk
+        match = _REPLY_FIELD_RE.search(self.buffer)
+        if not match:
+            return ""
+        
+        # Take the longest prefix of the string body that ends on a complete character
+        raw = self.buffer[match.end():]
+        end, i = 0, 0
+        while i < len(raw):
+            if raw[i] == '"':
+                break
+            if raw[i] == '\\':
+                step = 6 if raw[i + 1:i + 2] == 'u' else 2
+                if i + step > len(raw):
+                    break
+                i += step
+            else:
+                i += 1
+            end = i
+        
+        try:
+            text = _json_loads('"' + raw[:end] + '"')
+        except json.JSONDecodeError:
+            return ""
+        delta = text[self.emitted:]
+        self.emitted = len(text)
+        return delta
 
 
 class BookingAgent:
     """Conversational booking agent using LangGraph."""
     
     def __init__(self):
+        self._configure_llm_cache()
         self.llm = ChatOpenAI(
             model="gpt-4o-mini",
             temperature=0.1,
             api_key=os.getenv("OPENAI_API_KEY")
         )
+        self._fast_classifier = FastIntentClassifier()
+        self.batcher = LLMBatcher(self.llm, response_schema=_TURN_SCHEMA)
         self.calendar_service = GoogleCalendarService()
-        self.timezone = pytz.timezone(os.getenv('TIMEZONE', 'America/New_York'))
+        self.timezone = settings.TIMEZONE_OBJ
+        # (session_id, start date, end date, duration) -> available slots
+        self._availability_cache: TTLCache = TTLCache(
+            maxsize=_AVAILABILITY_CACHE_SIZE, ttl=_CALENDAR_CACHE_TTL_SECONDS
+        )
+        # session_id -> (start date, end date, busy periods) for the default week
+        self._busy_prefetch: TTLCache = TTLCache(maxsize=settings.MAX_SESSIONS, ttl=_CALENDAR_CACHE_TTL_SECONDS)
+        self._turn_prompt = self._build_turn_prompt()
         self.graph = self._build_graph()
     
+    def _configure_llm_cache(self):
+        """Cache LLM responses so repeated prompts skip the API call."""
+        redis_url = os.getenv('LLM_CACHE_REDIS_URL')
+        if redis_url:
+            # Semantic cache also matches paraphrases ("hi" / "hello there")
+            try:
+                from langchain_community.cache import RedisSemanticCache
+                from langchain_openai import OpenAIEmbeddings
+                set_llm_cache(RedisSemanticCache(redis_url=redis_url, embedding=OpenAIEmbeddings()))
+                return
+            except ImportError as e:
+                logger.warning("⚠️  Redis semantic cache not available, using SQLite: %s", e)
+        
+        set_llm_cache(SQLiteCache(database_path=os.getenv('LLM_CACHE_PATH', '.llm_cache.db')))
+    
     def _build_graph(self) -> StateGraph:
         """Build the LangGraph conversation flow."""
         workflow = StateGraph(AgentState)
         
         # Add nodes
-        workflow.add_node("analyze_intent", self._analyze_intent)
-        workflow.add_node("extract_info", self._extract_info)
-        workflow.add_node("check_availability", self._check_availability)
+        workflow.add_node("analyze_turn", self._analyze_turn)
+        workflow.add_node("check_availability", self._filter_by_extracted)
         workflow.add_node("confirm_booking", self._confirm_booking)
         workflow.add_node("create_event", self._create_event)
         workflow.add_node("generate_response", self._generate_response)
         
         # Set entry point
-        workflow.set_entry_point("analyze_intent")
+        workflow.set_entry_point("analyze_turn")
         
         # Add edges
         workflow.add_conditional_edges(
-            "analyze_intent",
+            "analyze_turn",
             self._route_after_intent,
             {
-                "extract_info": "extract_info",
                 "check_availability": "check_availability",
                 "confirm_booking": "confirm_booking",
                 "generate_response": "generate_response"
             }
         )
         
-        workflow.add_edge("extract_info", "check_availability")
         workflow.add_edge("check_availability", "generate_response")
         workflow.add_edge("confirm_booking", "create_event")
         workflow.add_edge("create_event", "generate_response")
@@ -69,13 +222,13 @@ class BookingAgent:
         memory = MemorySaver()
         return workflow.compile(checkpointer=memory)
     
-    def _analyze_intent(self, state: AgentState) -> AgentState:
-        """Analyze user intent from the message."""
-        last_message = state.messages[-1]["content"] if state.messages else ""
-        
-        intent_prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an intent classifier for a calendar booking agent. 
-            Analyze the user's message and classify the intent into one of these categories:
+    def _build_turn_prompt(self) -> ChatPromptTemplate:
+        """Build the fused intent/extraction/reply prompt once per agent."""
+        return ChatPromptTemplate.from_messages([
+            ("system", """You are the language understanding step of a calendar booking agent.
+            For the user's messages, return a single JSON object with exactly these keys:
+            
+            "intent": one of
             - greeting: General greeting or introduction
             - book_meeting: User wants to schedule a meeting/appointment
             - check_availability: User wants to see available times
@@ -84,93 +237,114 @@ class BookingAgent:
             - cancel_booking: User wants to cancel a booking
             - other: Other intents
             
-            Current conversation step: {current_step}
-            
-            Respond with just the intent category."""),
-            ("human", "{message}")
-        ])
-        
-        response = self.llm.invoke(
-            intent_prompt.format_messages(
-                message=last_message,
-                current_step=state.current_step
-            )
-        )
-        
-        state.intent = response.content.strip().lower()
-        return state
-    
-    def _extract_info(self, state: AgentState) -> AgentState:
-        """Extract booking information from user messages."""
-        messages_text = "\n".join([msg["content"] for msg in state.messages if msg["role"] == "user"])
-        
-        extraction_prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an information extraction agent for calendar booking.
-            Extract the following information from the user's messages:
+            "extracted": an object with
             - date: Any mentioned dates (convert to YYYY-MM-DD format)
             - time: Any mentioned times (convert to HH:MM format)
             - duration: Meeting duration in minutes (default 60 if not specified)
             - title: Meeting title or purpose
             - description: Additional details about the meeting
             - attendee_email: Any email addresses mentioned
-            
-            Current date: {current_date}
-            Current time: {current_time}
-            
             Handle relative dates like "tomorrow", "next week", "Friday", etc.
+            Use null for missing information.
             
-            Return the information as a JSON object. Use null for missing information."""),
-            ("human", "{messages}")
+            "reply": a short, friendly response to the latest message.
+            If the user seems confused, offer to help with booking.
+            If they ask about something unrelated to calendar booking, politely redirect.
+            
+            Respond with the JSON object only."""),
+            ("human", """Current conversation step: {current_step}
+Current date: {current_date}
+
+Conversation so far:
+{messages}
+
+Latest message: {message}""")
         ])
+    
+    async def _analyze_turn(self, state: AgentState, config: Optional[RunnableConfig] = None) -> AgentState:
+        """Classify intent, extract booking info and draft a reply in one LLM call."""
+        last_message = state.messages[-1]["content"] if state.messages else ""
+        
+        # Trivial turns ("hi", "yes") get templated replies; skip the LLM
+        fast = self._fast_classifier.classify(last_message)
+        if fast.confidence > 0.9 and fast.label in _FAST_INTENTS:
+            state.intent = fast.label
+            return state
+        
+        # Extraction rarely needs deep history; scan back for the latest user messages only
+        recent = islice((msg["content"] for msg in reversed(state.messages) if msg["role"] == "user"),
+                        _PROMPT_USER_MESSAGES)
+        messages_text = "\n".join(reversed(list(recent)))
         
         now = datetime.now(self.timezone)
-        response = self.llm.invoke(
-            extraction_prompt.format_messages(
-                messages=messages_text,
-                current_date=now.strftime("%Y-%m-%d"),
-                current_time=now.strftime("%H:%M")
-            )
+        prompt_messages = self._turn_prompt.format_messages(
+            messages=messages_text,
+            message=last_message,
+            current_step=state.current_step,
+            current_date=now.strftime("%Y-%m-%d")
         )
+        if (config or {}).get("configurable", {}).get("stream_tokens"):
+            # Call the model directly so astream_events can surface its tokens
+            llm_call = self._astream_completion(prompt_messages)
+        else:
+            llm_call = self.batcher.ainvoke(prompt_messages)
+        
+        if state.session_id in self._busy_prefetch:
+            content = await llm_call
+        else:
+            # Hide the calendar round-trip behind the LLM latency; the prefetch is only
+            # speculative, so its failure must not fail the turn
+            content, prefetch = await asyncio.gather(
+                llm_call, self._fetch_default_week_slots(state), return_exceptions=True
+            )
+            if isinstance(content, BaseException):
+                raise content
+            if isinstance(prefetch, Exception):
+                logger.warning("⚠️  Calendar prefetch failed: %s", prefetch)
         
         try:
-            extracted = json.loads(response.content)
-            state.extracted_info.update(extracted)
+            parsed = _json_loads(content)
         except json.JSONDecodeError:
+            parsed = {}
+        
+        state.intent = str(parsed.get("intent") or "other").strip().lower()
+        
+        extracted = parsed.get("extracted")
+        if isinstance(extracted, dict):
+            state.extracted_info.update({k: v for k, v in extracted.items() if v is not None})
+        else:
             # Fallback to simple regex extraction
             state.extracted_info.update(self._simple_extract(messages_text))
         
+        state.final_response = parsed.get("reply")
         return state
     
+    async def _astream_completion(self, prompt_messages: List) -> str:
+        """Stream the fused JSON completion and return its full content."""
+        content = ""
+        async for chunk in self.batcher.astream(prompt_messages):
+            content += chunk.content
+        return content
+    
     def _simple_extract(self, text: str) -> Dict[str, Any]:
         """Simple regex-based information extraction as fallback."""
         info = {}
+        text = text.lower()
         
         # Extract dates
-        date_patterns = [
-            r'tomorrow',
-            r'today',
-            r'next week',
-            r'this week',
-            r'(monday|tuesday|wednesday|thursday|friday|saturday|sunday)',
-            r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}',
-            r'(january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{1,2}'
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, text.lower())
+        for pattern in _DATE_PATTERNS:
+            match = pattern.search(text)
             if match:
                 info['date'] = match.group()
                 break
         
         # Extract times
-        time_pattern = r'\d{1,2}:\d{2}\s*(am|pm)?|\d{1,2}\s*(am|pm)'
-        time_match = re.search(time_pattern, text.lower())
+        time_match = _TIME_RE.search(text)
         if time_match:
             info['time'] = time_match.group()
         
         # Extract duration
-        duration_pattern = r'(\d+)\s*(hour|hr|minute|min)'
-        duration_match = re.search(duration_pattern, text.lower())
+        duration_match = _DURATION_RE.search(text)
         if duration_match:
             value = int(duration_match.group(1))
             unit = duration_match.group(2)
@@ -181,8 +355,27 @@ class BookingAgent:
         
         return info
     
-    def _check_availability(self, state: AgentState) -> AgentState:
-        """Check calendar availability based on extracted information."""
+    def _default_range(self) -> tuple:
+        """Default availability window: the week starting tomorrow."""
+        start_date = datetime.now(self.timezone) + timedelta(days=1)
+        return start_date.date(), (start_date + timedelta(days=7)).date()
+    
+    async def _fetch_busy(self, start_day, end_day) -> List[Dict]:
+        """Fetch busy periods covering the working hours of a date range."""
+        return await self.calendar_service.afreebusy_query(
+            self._working_time(start_day, settings.WORKING_HOURS[0]),
+            self._working_time(end_day, settings.WORKING_HOURS[1]),
+            [settings.DEFAULT_CALENDAR_ID]
+        )
+    
+    async def _fetch_default_week_slots(self, state: AgentState) -> None:
+        """Prefetch busy periods for the default week, independent of extraction."""
+        start_day, end_day = self._default_range()
+        busy_times = await self._fetch_busy(start_day, end_day)
+        self._busy_prefetch[state.session_id] = (start_day, end_day, busy_times)
+    
+    async def _filter_by_extracted(self, state: AgentState) -> AgentState:
+        """Compute available slots for the extracted date and duration."""
         extracted = state.extracted_info
         
         # Determine date range
@@ -191,20 +384,76 @@ class BookingAgent:
             start_date = datetime.now(self.timezone) + timedelta(days=1)  # Default to tomorrow
         
         end_date = start_date + timedelta(days=7)  # Check next 7 days
+        start_day, end_day = start_date.date(), end_date.date()
         
         # Get duration
-        duration = extracted.get('duration', 60)
-        
-        # Find available slots
-        available_slots = self.calendar_service.find_available_slots(
-            start_date=start_date,
-            end_date=end_date,
-            duration_minutes=duration
-        )
+        duration = int(extracted.get('duration') or settings.DEFAULT_MEETING_DURATION)
+        
+        # Reuse slots computed for this range within the last minute
+        cache_key = (state.session_id, start_day, end_day, duration)
+        slots = self._availability_cache.get(cache_key)
+        if slots is None:
+            prefetched = self._busy_prefetch.get(state.session_id)
+            if prefetched and prefetched[0] <= start_day and end_day <= prefetched[1]:
+                busy_times = prefetched[2]
+            else:
+                busy_times = await self._fetch_busy(start_day, end_day)
+            
+            slots = list(islice(
+                self._iter_free_slots(busy_times, start_day, end_day, duration),
+                _SLOTS_TO_OFFER
+            ))
+            self._availability_cache[cache_key] = slots
         
-        state.available_slots = available_slots
+        state.available_slots = slots
         return state
     
+    def _working_time(self, day, hour: int) -> datetime:
+        """Localized datetime for an hour on the given day."""
+        return datetime.combine(day, datetime.min.time().replace(hour=hour), tzinfo=self.timezone)
+    
+    def _iter_free_slots(self, busy_times: List[Dict], start_day, end_day,
+                         duration_minutes: int) -> Iterator[Dict]:
+        """
+        Lazily yield free working-hour slots, day by day.
+        
+        Uses the same FreeSlotFinder as the calendar service, so a slot is the
+        start of each free gap long enough for the meeting.
+        """
+        busy_periods = [
+            (parse_api_datetime(busy['start']), parse_api_datetime(busy['end']))
+            for busy in busy_times
+        ]
+        slot_delta = timedelta(minutes=duration_minutes)
+        
+        current_day = start_day
+        while current_day <= end_day:
+            # Skip weekends by jumping straight to Monday
+            if current_day.weekday() >= 5:
+                current_day += timedelta(days=7 - current_day.weekday())
+                continue
+            
+            finder = FreeSlotFinder(
+                busy_periods,
+                self._working_time(current_day, settings.WORKING_HOURS[0]),
+                self._working_time(current_day, settings.WORKING_HOURS[1])
+            )
+            for start in finder.free_slots(slot_delta):
+                yield self._make_slot(start, slot_delta)
+            
+            current_day += timedelta(days=1)
+    
+    def _make_slot(self, start: datetime, slot_delta: timedelta) -> Dict:
+        """Build a slot dict in the calendar service's format."""
+        end = start + slot_delta
+        return {
+            'start': start,
+            'end': end,
+            'date': start.strftime('%Y-%m-%d'),
+            'start_time': start.strftime('%I:%M %p'),
+            'end_time': end.strftime('%I:%M %p')
+        }
+    
     def _parse_date(self, date_str: Optional[str]) -> Optional[datetime]:
         """Parse date string to datetime object."""
         if not date_str:
@@ -219,11 +468,9 @@ class BookingAgent:
             return now + timedelta(days=1)
         elif date_str == 'next week':
             return now + timedelta(days=7)
-        elif date_str in ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']:
+        elif date_str in _WEEKDAY_IDX:
             # Find next occurrence of this weekday
-            weekdays = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-            target_weekday = weekdays.index(date_str)
-            days_ahead = target_weekday - now.weekday()
+            days_ahead = _WEEKDAY_IDX[date_str] - now.weekday()
             if days_ahead <= 0:  # Target day already happened this week
                 days_ahead += 7
             return now + timedelta(days=days_ahead)
@@ -257,7 +504,7 @@ class BookingAgent:
         
         return state
     
-    def _create_event(self, state: AgentState) -> AgentState:
+    async def _create_event(self, state: AgentState) -> AgentState:
         """Create the calendar event."""
         if not state.selected_slot:
             return state
@@ -267,7 +514,7 @@ class BookingAgent:
         description = state.extracted_info.get('description', 'Scheduled via AI booking agent')
         attendee_email = state.extracted_info.get('attendee_email')
         
-        event_id = self.calendar_service.create_event(
+        event_id = await self.calendar_service.acreate_event(
             title=title,
             start_time=slot['start'],
             end_time=slot['end'],
@@ -278,6 +525,9 @@ class BookingAgent:
         if event_id:
             state.current_step = "completed"
             state.extracted_info['event_id'] = event_id
+            # The new event changes free/busy for every cached range
+            self._availability_cache.clear()
+            self._busy_prefetch.clear()
         
         return state
     
@@ -295,6 +545,8 @@ class BookingAgent:
         else:
             state.final_response = self._generate_general_response(state)
 
+        # Keep the reply in the checkpointed history for the next turn's prompt
+        state.messages = _recent([*state.messages, {"role": "assistant", "content": state.final_response}])
         return state
 
     def _generate_greeting_response(self) -> str:
@@ -325,7 +577,7 @@ class BookingAgent:
 
         # Show available slots
         response = "Great! I found some available time slots for you:\n\n"
-        for i, slot in enumerate(state.available_slots[:3], 1):
+        for i, slot in enumerate(state.available_slots[:_SLOTS_TO_OFFER], 1):
             response += f"{i}. {slot['date']} from {slot['start_time']} to {slot['end_time']}\n"
 
         response += "\nWhich time works best for you? Just let me know the number or tell me your preference!"
@@ -356,59 +608,65 @@ You should receive a calendar invitation shortly. Is there anything else I can h
             return "Your booking has been confirmed! You should receive a calendar invitation shortly."
 
     def _generate_general_response(self, state: AgentState) -> str:
-        """Generate a general response using LLM."""
-        response_prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a helpful calendar booking assistant. Respond naturally and helpfully to the user's message.
-
-            Context:
-            - Current step: {current_step}
-            - Intent: {intent}
-            - Available information: {extracted_info}
-
-            Guidelines:
-            - Be conversational and friendly
-            - If the user seems confused, offer to help with booking
-            - If they ask about something unrelated to calendar booking, politely redirect
-            - Keep responses concise but helpful"""),
-            ("human", "{last_message}")
-        ])
-
-        last_message = state.messages[-1]["content"] if state.messages else ""
-
-        response = self.llm.invoke(
-            response_prompt.format_messages(
-                current_step=state.current_step,
-                intent=state.intent or "unknown",
-                extracted_info=json.dumps(state.extracted_info),
-                last_message=last_message
-            )
-        )
-
-        return response.content
+        """Return the reply drafted alongside intent classification."""
+        if state.final_response:
+            return state.final_response
+        return "I'm here to help you schedule meetings and manage your calendar. You can ask me to 'schedule a meeting', 'check availability', or 'book an appointment'. How can I assist you today?"
     
     def _route_after_intent(self, state: AgentState) -> str:
         """Route to next node based on intent."""
         intent = state.intent
         
         if intent in ['book_meeting', 'check_availability']:
-            return "extract_info"
+            return "check_availability"
         elif intent == 'confirm_booking':
             return "confirm_booking"
         else:
             return "generate_response"
     
-    def process_message(self, message: str, session_id: str) -> Dict[str, Any]:
-        """Process a user message and return response."""
-        # Create initial state
-        initial_state = AgentState(
-            messages=[{"role": "user", "content": message}],
+    async def _turn_input(self, message: str, session_id: str, config: Dict[str, Any]) -> AgentState:
+        """Fresh per-turn state carrying the checkpointed history plus the new message."""
+        snapshot = await self.graph.aget_state(config)
+        history = list((snapshot.values or {}).get("messages", ()))
+        return AgentState.build_trusted(
+            messages=_recent([*history, {"role": "user", "content": message}]),
             session_id=session_id
         )
-        
-        # Run the graph
+    
+    async def aprocess_message(self, message: str, session_id: str) -> Dict[str, Any]:
+        """Process a user message and return response."""
         config = {"configurable": {"thread_id": session_id}}
-        result = self.graph.invoke(initial_state, config)
+        initial_state = await self._turn_input(message, session_id, config)
         
+        # Run the graph
+        result = await self.graph.ainvoke(initial_state, config)
+        return self._result_payload(AgentState.build_trusted(**result), session_id)
+    
+    async def astream_message(self, message: str, session_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a user message, yielding reply tokens as they are generated.
+        
+        Yields {"type": "token", "content": ...} events while the LLM drafts a
+        free-form reply, then a single {"type": "done", "result": ...} event
+        carrying the same payload as aprocess_message. Templated replies (slot
+        lists, confirmations) only arrive in the final event.
+        """
+        config = {"configurable": {"thread_id": session_id, "stream_tokens": True}}
+        initial_state = await self._turn_input(message, session_id, config)
+        
+        streamer = _ReplyStreamer()
+        async for event in self.graph.astream_events(initial_state, config, version="v2"):
+            if event["event"] == "on_chat_model_stream":
+                delta = streamer.feed(event["data"]["chunk"].content)
+                intent = streamer.intent
+                if delta and intent and intent not in _TEMPLATED_INTENTS:
+                    yield {"type": "token", "content": delta}
+        
+        result = AgentState.build_trusted(**(await self.graph.aget_state(config)).values)
+        yield {"type": "done", "result": self._result_payload(result, session_id)}
+    
+    def _result_payload(self, result: AgentState, session_id: str) -> Dict[str, Any]:
+        """Shape a final graph state into the response dict returned to callers."""
         return {
             "response": result.final_response,
             "session_id": session_id,
@@ -417,3 +675,14 @@ You should receive a calendar invitation shortly. Is there anything else I can h
             "available_slots": result.available_slots,
             "booking_confirmed": result.booking_confirmed
         }
+    
+    def process_message(self, message: str, session_id: str) -> Dict[str, Any]:
+        """Synchronous wrapper around aprocess_message for scripts and tests."""
+        async def run_once() -> Dict[str, Any]:
+            try:
+                return await self.aprocess_message(message, session_id)
+            finally:
+                # The Calendar client belongs to this call's event loop, which asyncio.run closes
+                await close_http_client()
+        
+        return asyncio.run(run_once())
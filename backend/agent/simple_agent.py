@@ -4,20 +4,131 @@ Simple booking agent that works without OpenAI API for testing.
 
 import re
 import json
+import logging
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-import pytz
+from typing import Dict, List, Any, Optional, Tuple, NamedTuple
+from cachetools import TTLCache
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+from backend.config import settings
 from backend.calendar.mock_calendar import MockCalendarService
 
+logger = logging.getLogger(__name__)
+
+# Intent keywords (whole-word matches), tagged with the intent they signal
+_INTENT_KEYWORDS = {
+    'greeting': ('hello', 'hi', 'hey', 'good morning', 'good afternoon'),
+    'confirm_booking': ('yes', 'confirm', 'confirmed', 'ok', 'okay', 'sure', 'sounds good', 'perfect'),
+    'select_slot': ('first', 'second', 'third', 'option', '1', '2', '3'),
+    'book_meeting': (
+        'schedule', 'scheduling', 'book', 'booking', 'meeting', 'meetings',
+        'appointment', 'appointments', 'call', 'time', 'times',
+        'available', 'availability', 'free', 'open', 'when'
+    ),
+}
+# Order in which matched intents win (greeting is handled separately)
+_INTENT_PRIORITY = ('confirm_booking', 'select_slot', 'book_meeting')
+
+# Extraction patterns
+_WEEKDAY_IDX = {
+    'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
+    'friday': 4, 'saturday': 5, 'sunday': 6
+}
+_WEEKDAY_RE = re.compile(r"\b(" + "|".join(_WEEKDAY_IDX) + r")\b")
+_TIME_RE = re.compile(r"(\d{1,2}:\d{2}\s*(?:am|pm)?|\d{1,2}\s*(?:am|pm))", re.I)
+_DAYPART_RE = re.compile(r"\b(afternoon|morning|evening)\b")
+_DURATION_RE = re.compile(r"\b(\d+|one|two)[\s-]*(hours?|hrs?|minutes?|mins?)\b")
+_DURATION_WORDS = {'one': 1, 'two': 2}
+
+# Number of slots shown to (and selectable by) the user
+_SLOTS_TO_OFFER = 3
+
+
+class _KeywordMatcher:
+    """Single-pass multi-keyword matcher.
+
+    Uses a pyahocorasick automaton when the package is installed and a single
+    combined alternation regex otherwise.
+    """
+    
+    def __init__(self, keywords: Dict[str, Tuple[str, ...]]):
+        self._automaton = None
+        self._regex = None
+        self._labels = {word: label for label, words in keywords.items() for word in words}
+        
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for word, label in self._labels.items():
+                self._automaton.add_word(word, (label, len(word)))
+            self._automaton.make_automaton()
+        else:
+            # Longest keywords first so "good morning" wins over shorter overlaps
+            words = sorted(self._labels, key=len, reverse=True)
+            self._regex = re.compile(r"\b(" + "|".join(map(re.escape, words)) + r")\b")
+    
+    def counts(self, text: str) -> Counter:
+        """Count whole-word keyword hits per label in one scan of the text."""
+        counts = Counter()
+        if self._automaton is not None:
+            for end, (label, length) in self._automaton.iter(text):
+                start = end - length + 1
+                if (start == 0 or not text[start - 1].isalnum()) and \
+                        (end + 1 == len(text) or not text[end + 1].isalnum()):
+                    counts[label] += 1
+        else:
+            for match in self._regex.finditer(text):
+                counts[self._labels[match.group(1)]] += 1
+        return counts
+
+
+class IntentGuess(NamedTuple):
+    """Intent label with a rough confidence in [0, 1]."""
+    label: str
+    confidence: float
+
+
+class FastIntentClassifier:
+    """Keyword-based intent classifier shared by the simple and LLM agents."""
+    
+    def __init__(self):
+        self._matcher = _KeywordMatcher(_INTENT_KEYWORDS)
+    
+    def classify(self, message: str) -> IntentGuess:
+        """Classify a message; short messages hitting a single intent are high confidence."""
+        text = message.lower().strip()
+        word_count = len(text.split())
+        counts = self._matcher.counts(text)
+        
+        if counts['greeting'] and word_count <= 3:
+            label = 'greeting'
+        else:
+            label = next((intent for intent in _INTENT_PRIORITY if counts[intent]), 'general')
+        
+        if label == 'general':
+            return IntentGuess(label, 0.0)
+        # "hi", "yes please", "2" - nothing else in the message to interpret
+        if word_count <= 3 and len(counts) == 1:
+            return IntentGuess(label, 0.95)
+        return IntentGuess(label, 0.6)
+
 
 class SimpleBookingAgent:
     """Simple rule-based booking agent for testing without OpenAI API."""
     
     def __init__(self):
         self.calendar_service = MockCalendarService()
-        self.timezone = pytz.timezone('America/New_York')
-        self.sessions = {}
+        self.timezone = settings.TIMEZONE_OBJ
+        # Idle sessions expire and the least recently used are evicted when full
+        self.sessions = TTLCache(
+            maxsize=settings.MAX_SESSIONS,
+            ttl=settings.SESSION_TIMEOUT_HOURS * 3600
+        )
+        self._intent_classifier = FastIntentClassifier()
     
     def process_message(self, message: str, session_id: str) -> Dict[str, Any]:
         """Process a user message and return response."""
@@ -41,7 +152,8 @@ class SimpleBookingAgent:
         extracted_info = self._extract_info(message)
         session['extracted_info'].update(extracted_info)
 
-        print(f"DEBUG: Session step: {session['step']}, Intent: {intent}, Extracted: {extracted_info}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Session step: %s, Intent: %s, Extracted: %s", session['step'], intent, extracted_info)
         
         # Generate response based on intent and session state
         if intent == 'greeting' and session['step'] == 'greeting':
@@ -72,7 +184,11 @@ class SimpleBookingAgent:
         else:
             response = self._handle_general(message)
 
-        print(f"DEBUG: After processing - Session step: {session['step']}, Response: {response[:50]}...")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("After processing - Session step: %s, Response: %s...", session['step'], response[:50])
+        
+        # Re-insert so the TTL counts from the latest activity
+        self.sessions[session_id] = session
         
         return {
             "response": response,
@@ -85,23 +201,7 @@ class SimpleBookingAgent:
     
     def _analyze_intent(self, message: str) -> str:
         """Simple rule-based intent analysis."""
-        
-        greeting_words = ['hello', 'hi', 'hey', 'good morning', 'good afternoon']
-        booking_words = ['schedule', 'book', 'meeting', 'appointment', 'call', 'time']
-        availability_words = ['available', 'free', 'open', 'when']
-        confirmation_words = ['yes', 'confirm', 'ok', 'sure', 'sounds good', 'perfect']
-        selection_words = ['first', 'second', 'third', 'option', '1', '2', '3']
-        
-        if any(word in message for word in greeting_words) and len(message.split()) <= 3:
-            return 'greeting'
-        elif any(word in message for word in confirmation_words):
-            return 'confirm_booking'
-        elif any(word in message for word in selection_words):
-            return 'select_slot'
-        elif any(word in message for word in booking_words) or any(word in message for word in availability_words):
-            return 'book_meeting'
-        else:
-            return 'general'
+        return self._intent_classifier.classify(message).label
     
     def _extract_info(self, message: str) -> Dict[str, Any]:
         """Extract booking information from message."""
@@ -109,54 +209,33 @@ class SimpleBookingAgent:
         message_lower = message.lower()
         
         # Extract dates
+        now = datetime.now(self.timezone)
         if 'tomorrow' in message_lower:
-            tomorrow = datetime.now(self.timezone) + timedelta(days=1)
-            info['date'] = tomorrow.strftime('%Y-%m-%d')
+            info['date'] = (now + timedelta(days=1)).strftime('%Y-%m-%d')
         elif 'today' in message_lower:
-            today = datetime.now(self.timezone)
-            info['date'] = today.strftime('%Y-%m-%d')
+            info['date'] = now.strftime('%Y-%m-%d')
         elif 'next week' in message_lower:
-            next_week = datetime.now(self.timezone) + timedelta(days=7)
-            info['date'] = next_week.strftime('%Y-%m-%d')
-        elif 'friday' in message_lower:
-            # Find next Friday
-            today = datetime.now(self.timezone)
-            days_ahead = 4 - today.weekday()  # Friday is 4
-            if days_ahead <= 0:
-                days_ahead += 7
-            friday = today + timedelta(days=days_ahead)
-            info['date'] = friday.strftime('%Y-%m-%d')
-        elif 'monday' in message_lower:
-            # Find next Monday
-            today = datetime.now(self.timezone)
-            days_ahead = 0 - today.weekday()  # Monday is 0
-            if days_ahead <= 0:
-                days_ahead += 7
-            monday = today + timedelta(days=days_ahead)
-            info['date'] = monday.strftime('%Y-%m-%d')
+            info['date'] = (now + timedelta(days=7)).strftime('%Y-%m-%d')
+        else:
+            weekday_match = _WEEKDAY_RE.search(message_lower)
+            if weekday_match:
+                # Find the next occurrence of this weekday
+                days_ahead = _WEEKDAY_IDX[weekday_match.group(1)] - now.weekday()
+                if days_ahead <= 0:
+                    days_ahead += 7
+                info['date'] = (now + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
         
         # Extract times
-        time_patterns = [
-            r'(\d{1,2})\s*(am|pm)',
-            r'(\d{1,2}):(\d{2})\s*(am|pm)?',
-            r'afternoon',
-            r'morning',
-            r'evening'
-        ]
-        
-        for pattern in time_patterns:
-            match = re.search(pattern, message_lower)
-            if match:
-                info['time'] = match.group()
-                break
+        time_match = _TIME_RE.search(message_lower) or _DAYPART_RE.search(message_lower)
+        if time_match:
+            info['time'] = time_match.group()
         
         # Extract duration
-        if '30' in message and 'minute' in message_lower:
-            info['duration'] = 30
-        elif '1 hour' in message_lower or 'one hour' in message_lower:
-            info['duration'] = 60
-        elif '2 hour' in message_lower or 'two hour' in message_lower:
-            info['duration'] = 120
+        duration_match = _DURATION_RE.search(message_lower)
+        if duration_match:
+            amount = duration_match.group(1)
+            value = int(amount) if amount.isdigit() else _DURATION_WORDS[amount]
+            info['duration'] = value if duration_match.group(2).startswith('m') else value * 60
         
         # Extract meeting type/title
         if 'team' in message_lower:
@@ -183,7 +262,7 @@ class SimpleBookingAgent:
             # Show available slots again
             available_slots = session['available_slots']
             response = "Here are the available time slots again:\n\n"
-            for i, slot in enumerate(available_slots[:3], 1):
+            for i, slot in enumerate(available_slots, 1):
                 response += f"{i}. {slot['date']} from {slot['start_time']} to {slot['end_time']}\n"
             response += "\nWhich option works best for you? You can say 'option 1', 'the first one', or just '1'."
             return response
@@ -206,6 +285,8 @@ class SimpleBookingAgent:
             duration_minutes=duration
         )
 
+        # Keep only the slots the user can pick from
+        available_slots = available_slots[:_SLOTS_TO_OFFER]
         session['available_slots'] = available_slots
 
         if not available_slots:
@@ -213,7 +294,7 @@ class SimpleBookingAgent:
 
         # Show available slots
         response = "Great! I found some available time slots for you:\n\n"
-        for i, slot in enumerate(available_slots[:3], 1):
+        for i, slot in enumerate(available_slots, 1):
             response += f"{i}. {slot['date']} from {slot['start_time']} to {slot['end_time']}\n"
 
         response += "\nWhich option works best for you? You can say 'option 1', 'the first one', or just '1'."
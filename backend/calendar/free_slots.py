@@ -0,0 +1,86 @@
+"""
+Free-slot search over a working day's busy periods.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+def _utc(moment: datetime) -> datetime:
+    """Same instant in UTC, where datetime arithmetic follows real time across DST changes."""
+    return moment.astimezone(timezone.utc) if moment.tzinfo is not None else moment
+
+
+class FreeSlotFinder:
+    """
+    Merged, sorted busy intervals for one working day.
+
+    Busy periods are merged once on construction, so repeated queries for
+    different durations or start times (e.g. "what about 30 minutes
+    instead?") reuse the same structure and use binary search to find
+    their starting point.
+
+    Intervals are kept in UTC, so durations are real time even on a DST
+    change day; results are returned in the day's own timezone.
+    """
+
+    def __init__(self, busy_periods: Iterable[Tuple[datetime, datetime]],
+                 day_start: datetime, day_end: datetime):
+        self.day_start = day_start
+        self.day_end = day_end
+        self._tz = day_start.tzinfo
+        self._day_start = _utc(day_start)
+        self._day_end = _utc(day_end)
+        self._starts: List[datetime] = []
+        self._ends: List[datetime] = []
+
+        for busy_start, busy_end in sorted((_utc(start), _utc(end)) for start, end in busy_periods):
+            # Clip to the working day
+            busy_start, busy_end = max(busy_start, self._day_start), min(busy_end, self._day_end)
+            if busy_start >= busy_end:
+                continue
+            if self._ends and busy_start <= self._ends[-1]:
+                self._ends[-1] = max(self._ends[-1], busy_end)
+            else:
+                self._starts.append(busy_start)
+                self._ends.append(busy_end)
+
+    def _local(self, moment: datetime) -> datetime:
+        return moment.astimezone(self._tz) if self._tz is not None else moment
+
+    def _utc_gaps(self, after: Optional[datetime] = None) -> Iterator[Tuple[datetime, datetime]]:
+        current = max(_utc(after) if after else self._day_start, self._day_start)
+        # Skip busy intervals that ended by `current`
+        index = bisect_right(self._ends, current)
+
+        for busy_start, busy_end in zip(self._starts[index:], self._ends[index:]):
+            if current < busy_start:
+                yield current, busy_start
+            current = max(current, busy_end)
+
+        if current < self._day_end:
+            yield current, self._day_end
+
+    def gaps(self, after: Optional[datetime] = None) -> Iterator[Tuple[datetime, datetime]]:
+        """Yield free (start, end) gaps in order, beginning at `after` (default: day start)."""
+        for gap_start, gap_end in self._utc_gaps(after):
+            yield self._local(gap_start), self._local(gap_end)
+
+    def free_slots(self, duration: timedelta) -> Iterator[datetime]:
+        """Yield the start of each gap that can hold a meeting of `duration`."""
+        for gap_start, gap_end in self._utc_gaps():
+            if gap_start + duration <= gap_end:
+                yield self._local(gap_start)
+
+    def first_free(self, duration: timedelta, after: Optional[datetime] = None) -> Optional[datetime]:
+        """Earliest start at or after `after` with `duration` of free time, or None."""
+        for gap_start, gap_end in self._utc_gaps(after):
+            if gap_start + duration <= gap_end:
+                return self._local(gap_start)
+        return None
+
+    def check_conflict(self, start: datetime, end: datetime) -> bool:
+        """Whether [start, end) overlaps any busy interval, in O(log n)."""
+        index = bisect_left(self._starts, _utc(end))
+        return index > 0 and self._ends[index - 1] > _utc(start)
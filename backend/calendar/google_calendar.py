@@ -4,39 +4,154 @@ Handles authentication, availability checking, and event creation.
 """
 
 import os
-import pickle
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
-import pytz
+import sys
+import json
+import time
+import asyncio
+import logging
+import threading
+import weakref
+from collections import defaultdict
+from itertools import islice
+from urllib.parse import quote
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Iterator, List, Dict, Optional, Tuple
+import httpx
+import httplib2
 
+import google_auth_httplib2
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
+
+from backend.config import settings
+from backend.calendar.free_slots import FreeSlotFinder
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 # If modifying these scopes, delete the file token.json.
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
+CALENDAR_API_URL = 'https://www.googleapis.com/calendar/v3'
+
+# Python 3.11+ parses the API's trailing "Z" natively
+if sys.version_info >= (3, 11):
+    parse_api_datetime = datetime.fromisoformat
+else:
+    def parse_api_datetime(value: str) -> datetime:
+        """Parse an RFC 3339 timestamp as returned by the Calendar API."""
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+# token_file -> (credentials, monotonic time loaded, built service); access tokens live ~1 hour
+_CREDS_CACHE: Dict[str, Tuple[Credentials, float, object]] = {}
+_CREDS_TTL_SECONDS = 55 * 60
+_CREDS_LOCK = threading.Lock()
+
+# Busy periods fetched for availability are reused for this long
+_BUSY_CACHE_TTL_SECONDS = 60
+
+# Event loop -> connection pool shared by every GoogleCalendarService on that loop.
+# An AsyncClient's connections belong to the loop that opened them, so each loop
+# (the server's, or one per asyncio.run in scripts) gets its own.
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the running loop's Calendar API client, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _http_clients[loop] = httpx.AsyncClient(
+            base_url=CALENDAR_API_URL,
+            timeout=30.0,
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_keepalive_connections=20)
+        )
+    return client
+
+
+async def close_http_client():
+    """Close the running loop's Calendar API client, if one was created."""
+    client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
 
 class GoogleCalendarService:
     """Service class for Google Calendar operations."""
     
-    def __init__(self, credentials_file: str = "credentials.json", token_file: str = "token.json"):
+    def __init__(self, credentials_file: str = "credentials.json", token_file: str = "token.json",
+                 http_client: Optional[httpx.AsyncClient] = None):
         self.credentials_file = credentials_file
         self.token_file = token_file
         self.service = None
-        self.timezone = pytz.timezone(os.getenv('TIMEZONE', 'America/New_York'))
+        self.creds = None
+        # None means the running loop's shared client (see get_http_client)
+        self._http_client = http_client
+        # (calendar_id, day, working_hours) -> (monotonic time fetched, busy periods)
+        self._busy_cache: Dict[Tuple[str, date, Tuple[int, int]], Tuple[float, List[Tuple[datetime, datetime]]]] = {}
+        self.timezone = settings.TIMEZONE_OBJ
+        self.timezone_name = str(self.timezone)
         self._authenticate()
     
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Client for the async REST calls; only valid inside a running event loop."""
+        return self._http_client or get_http_client()
+    
     def _authenticate(self):
         """Authenticate with Google Calendar API."""
+        # One loader at a time, so concurrent startups don't stampede the refresh endpoint
+        with _CREDS_LOCK:
+            cached = _CREDS_CACHE.get(self.token_file)
+            if cached and time.monotonic() - cached[1] < _CREDS_TTL_SECONDS and cached[0].valid:
+                creds, _, service = cached
+            else:
+                creds = self._load_credentials()
+                service = self._build_service(creds)
+                _CREDS_CACHE[self.token_file] = (creds, time.monotonic(), service)
+        
+        self.creds = creds
+        # Shared by every instance; safe to call from worker threads concurrently
+        self.service = service
+    
+    @staticmethod
+    def _build_service(creds: Credentials):
+        """
+        Build the Calendar API client once per credentials.
+        
+        httplib2.Http is not thread-safe, so each request gets its own
+        authorized connection; the discovery document is the bundled static
+        copy, so nothing is fetched or written at build time.
+        """
+        def build_request(http, *args, **kwargs):
+            authorized_http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http())
+            return HttpRequest(authorized_http, *args, **kwargs)
+        
+        return build('calendar', 'v3', credentials=creds, cache_discovery=False,
+                     requestBuilder=build_request)
+    
+    def _load_credentials(self) -> Credentials:
+        """Load credentials from disk, refreshing or running the OAuth flow if needed."""
         creds = None
         
         # The file token.json stores the user's access and refresh tokens.
         if os.path.exists(self.token_file):
-            with open(self.token_file, 'rb') as token:
-                creds = pickle.load(token)
+            try:
+                with open(self.token_file, 'r') as token:
+                    creds = Credentials.from_authorized_user_info(json.load(token), SCOPES)
+            except (ValueError, KeyError):
+                # Unreadable or old pickle-format token; log in again below
+                creds = None
         
         # If there are no (valid) credentials available, let the user log in.
         if not creds or not creds.valid:
@@ -53,10 +168,16 @@ class GoogleCalendarService:
                 creds = flow.run_local_server(port=0)
             
             # Save the credentials for the next run
-            with open(self.token_file, 'wb') as token:
-                pickle.dump(creds, token)
+            with open(self.token_file, 'w') as token:
+                token.write(creds.to_json())
         
-        self.service = build('calendar', 'v3', credentials=creds)
+        return creds
+    
+    async def _auth_headers(self) -> Dict[str, str]:
+        """Bearer token headers for direct REST calls, refreshing if needed."""
+        if not self.creds.valid:
+            await asyncio.to_thread(self.creds.refresh, Request())
+        return {"Authorization": f"Bearer {self.creds.token}"}
     
     def get_free_busy(self, start_time: datetime, end_time: datetime, 
                       calendar_id: str = 'primary') -> List[Dict]:
@@ -75,7 +196,7 @@ class GoogleCalendarService:
             body = {
                 "timeMin": start_time.isoformat(),
                 "timeMax": end_time.isoformat(),
-                "timeZone": str(self.timezone),
+                "timeZone": self.timezone_name,
                 "items": [{"id": calendar_id}]
             }
             
@@ -83,14 +204,86 @@ class GoogleCalendarService:
             busy_times = freebusy_result['calendars'][calendar_id].get('busy', [])
             
             return busy_times
-        except HttpError as error:
-            print(f'An error occurred: {error}')
+        except HttpError:
+            logger.exception("Free/busy query failed")
+            return []
+    
+    async def aget_free_busy(self, start_time: datetime, end_time: datetime,
+                             calendar_id: str = 'primary') -> List[Dict]:
+        """
+        Async version of get_free_busy; several ranges can be gathered concurrently.
+        """
+        return await self.afreebusy_query(start_time, end_time, [calendar_id])
+    
+    def freebusy_query(self, start_time: datetime, end_time: datetime,
+                       calendar_ids: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Get busy periods for several calendars with a single FreeBusy request.
+        
+        Args:
+            start_time: Start of the time range
+            end_time: End of the time range
+            calendar_ids: Calendar IDs to check (defaults to the primary calendar)
+            
+        Returns:
+            Busy time slots across all calendars, sorted by start time
+        """
+        try:
+            return self._query_busy(start_time, end_time, calendar_ids or ['primary'])
+        except HttpError:
+            logger.exception("Free/busy query failed")
+            return []
+    
+    def _query_busy(self, start_time: datetime, end_time: datetime, calendar_ids: List[str]) -> List[Dict]:
+        """FreeBusy request behind freebusy_query; raises HttpError instead of reporting no busy time."""
+        body = {
+            "timeMin": start_time.isoformat(),
+            "timeMax": end_time.isoformat(),
+            "timeZone": self.timezone_name,
+            "items": [{"id": calendar_id} for calendar_id in calendar_ids]
+        }
+        
+        freebusy_result = self.service.freebusy().query(body=body).execute()
+        calendars = freebusy_result.get('calendars', {})
+        
+        busy_times = []
+        for calendar_id in calendar_ids:
+            busy_times.extend(calendars.get(calendar_id, {}).get('busy', []))
+        
+        return sorted(busy_times, key=lambda busy: busy['start'])
+    
+    async def afreebusy_query(self, start_time: datetime, end_time: datetime,
+                              calendar_ids: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Async version of freebusy_query using the pooled HTTP client.
+        """
+        calendar_ids = calendar_ids or ['primary']
+        try:
+            body = {
+                "timeMin": start_time.isoformat(),
+                "timeMax": end_time.isoformat(),
+                "timeZone": self.timezone_name,
+                "items": [{"id": calendar_id} for calendar_id in calendar_ids]
+            }
+            
+            response = await self.http_client.post('/freeBusy', json=body, headers=await self._auth_headers())
+            response.raise_for_status()
+            calendars = response.json().get('calendars', {})
+            
+            busy_times = []
+            for calendar_id in calendar_ids:
+                busy_times.extend(calendars.get(calendar_id, {}).get('busy', []))
+            
+            return sorted(busy_times, key=lambda busy: busy['start'])
+        except httpx.HTTPError:
+            logger.exception("Free/busy query failed")
             return []
     
     def find_available_slots(self, start_date: datetime, end_date: datetime,
                            duration_minutes: int = 60, 
                            working_hours: Tuple[int, int] = (9, 17),
-                           calendar_id: str = 'primary') -> List[Dict]:
+                           calendar_id: str = 'primary',
+                           max_slots: int = settings.MAX_AVAILABLE_SLOTS) -> List[Dict]:
         """
         Find available time slots within a date range.
         
@@ -100,69 +293,114 @@ class GoogleCalendarService:
             duration_minutes: Duration of the meeting in minutes
             working_hours: Tuple of (start_hour, end_hour) in 24-hour format
             calendar_id: Calendar ID to check
+            max_slots: Stop searching once this many slots are found
             
         Returns:
             List of available time slots
         """
-        available_slots = []
+        return list(islice(
+            self._iter_available_slots(start_date, end_date, duration_minutes, working_hours, calendar_id),
+            max_slots
+        ))
+    
+    def _iter_available_slots(self, start_date: datetime, end_date: datetime,
+                              duration_minutes: int, working_hours: Tuple[int, int],
+                              calendar_id: str) -> Iterator[Dict]:
+        """Yield available slots in order; only formats the slots that are consumed."""
         current_date = start_date.date()
         end_date_only = end_date.date()
         
+        # Loop invariants
+        start_t = dt_time(hour=working_hours[0])
+        end_t = dt_time(hour=working_hours[1])
+        slot_delta = timedelta(minutes=duration_minutes)
+        one_day = timedelta(days=1)
+        
+        busy_by_day = self._busy_by_day(calendar_id, current_date, end_date_only, working_hours)
+        
         while current_date <= end_date_only:
-            # Skip weekends
+            # Skip weekends by jumping straight to Monday
             if current_date.weekday() >= 5:  # Saturday = 5, Sunday = 6
-                current_date += timedelta(days=1)
+                current_date += timedelta(days=7 - current_date.weekday())
                 continue
             
             # Create datetime objects for the working day
-            day_start = self.timezone.localize(
-                datetime.combine(current_date, datetime.min.time().replace(hour=working_hours[0]))
-            )
-            day_end = self.timezone.localize(
-                datetime.combine(current_date, datetime.min.time().replace(hour=working_hours[1]))
-            )
+            day_start = datetime.combine(current_date, start_t, tzinfo=self.timezone)
+            day_end = datetime.combine(current_date, end_t, tzinfo=self.timezone)
             
-            # Get busy times for this day
-            busy_times = self.get_free_busy(day_start, day_end, calendar_id)
-            
-            # Convert busy times to datetime objects
-            busy_periods = []
-            for busy in busy_times:
-                busy_start = datetime.fromisoformat(busy['start'].replace('Z', '+00:00'))
-                busy_end = datetime.fromisoformat(busy['end'].replace('Z', '+00:00'))
-                busy_periods.append((busy_start, busy_end))
-            
-            # Sort busy periods by start time
-            busy_periods.sort(key=lambda x: x[0])
-            
-            # Find free slots
-            current_time = day_start
-            for busy_start, busy_end in busy_periods:
-                # Check if there's a free slot before this busy period
-                if current_time + timedelta(minutes=duration_minutes) <= busy_start:
-                    available_slots.append({
-                        'start': current_time,
-                        'end': current_time + timedelta(minutes=duration_minutes),
-                        'date': current_date.strftime('%Y-%m-%d'),
-                        'start_time': current_time.strftime('%I:%M %p'),
-                        'end_time': (current_time + timedelta(minutes=duration_minutes)).strftime('%I:%M %p')
-                    })
-                
-                current_time = max(current_time, busy_end)
-            
-            # Check for free slot after the last busy period
-            if current_time + timedelta(minutes=duration_minutes) <= day_end:
-                available_slots.append({
+            date_str = current_date.strftime('%Y-%m-%d')
+            finder = FreeSlotFinder(busy_by_day.get(current_date, []), day_start, day_end)
+            for current_time in finder.free_slots(slot_delta):
+                slot_end = current_time + slot_delta
+                yield {
                     'start': current_time,
-                    'end': current_time + timedelta(minutes=duration_minutes),
-                    'date': current_date.strftime('%Y-%m-%d'),
+                    'end': slot_end,
+                    'date': date_str,
                     'start_time': current_time.strftime('%I:%M %p'),
-                    'end_time': (current_time + timedelta(minutes=duration_minutes)).strftime('%I:%M %p')
-                })
+                    'end_time': slot_end.strftime('%I:%M %p')
+                }
             
-            current_date += timedelta(days=1)
+            current_date += one_day
+    
+    def _busy_by_day(self, calendar_id: str, first_day: date, last_day: date,
+                     working_hours: Tuple[int, int]) -> Dict[date, List[Tuple[datetime, datetime]]]:
+        """
+        Busy periods per local day, reusing days fetched within the last minute.
         
-        return available_slots[:10]  # Return max 10 slots
+        Follow-up questions in a conversation ("what about Thursday?", "30
+        minutes instead?") usually look at days that were just fetched, so
+        a fully cached range skips the FreeBusy round trip.
+        """
+        now = time.monotonic()
+        one_day = timedelta(days=1)
+        days = [first_day + one_day * i for i in range((last_day - first_day).days + 1)]
+        
+        cached = {}
+        for day in days:
+            entry = self._busy_cache.get((calendar_id, day, working_hours))
+            if entry and now - entry[0] < _BUSY_CACHE_TTL_SECONDS:
+                cached[day] = entry[1]
+        if len(cached) == len(days):
+            return cached
+        
+        # One FreeBusy request for the whole range, bucketed by local day
+        range_start = datetime.combine(first_day, dt_time(hour=working_hours[0]), tzinfo=self.timezone)
+        range_end = datetime.combine(last_day, dt_time(hour=working_hours[1]), tzinfo=self.timezone)
+        busy_by_day = defaultdict(list)
+        try:
+            busy_periods = self._query_busy(range_start, range_end, [calendar_id])
+        except HttpError:
+            # Report no busy time as before, but don't remember the range as free
+            logger.exception("Free/busy query failed")
+            return busy_by_day
+        for busy in busy_periods:
+            busy_start = parse_api_datetime(busy['start'])
+            busy_end = parse_api_datetime(busy['end'])
+            # A period spanning midnight blocks every day it touches
+            day = busy_start.astimezone(self.timezone).date()
+            end_day = busy_end.astimezone(self.timezone).date()
+            while day <= end_day:
+                busy_by_day[day].append((busy_start, busy_end))
+                day += one_day
+        
+        # Drop stale entries, then remember every day in the range (including free ones)
+        self._busy_cache = {
+            key: entry for key, entry in self._busy_cache.items()
+            if now - entry[0] < _BUSY_CACHE_TTL_SECONDS
+        }
+        for day in days:
+            self._busy_cache[(calendar_id, day, working_hours)] = (now, busy_by_day.get(day, []))
+        
+        return busy_by_day
+    
+    def _invalidate_busy(self, calendar_id: str, start_time: datetime, end_time: datetime):
+        """Forget cached busy periods for the days an event touches."""
+        first_day = start_time.astimezone(self.timezone).date()
+        last_day = end_time.astimezone(self.timezone).date()
+        self._busy_cache = {
+            key: entry for key, entry in self._busy_cache.items()
+            if not (key[0] == calendar_id and first_day <= key[1] <= last_day)
+        }
     
     def create_event(self, title: str, start_time: datetime, end_time: datetime,
                      description: str = "", attendee_email: str = None,
@@ -182,36 +420,62 @@ class GoogleCalendarService:
             Event ID if successful, None otherwise
         """
         try:
-            event = {
-                'summary': title,
-                'description': description,
-                'start': {
-                    'dateTime': start_time.isoformat(),
-                    'timeZone': str(self.timezone),
-                },
-                'end': {
-                    'dateTime': end_time.isoformat(),
-                    'timeZone': str(self.timezone),
-                },
-                'reminders': {
-                    'useDefault': False,
-                    'overrides': [
-                        {'method': 'email', 'minutes': 24 * 60},
-                        {'method': 'popup', 'minutes': 10},
-                    ],
-                },
-            }
-            
-            if attendee_email:
-                event['attendees'] = [{'email': attendee_email}]
-            
+            event = self._event_body(title, start_time, end_time, description, attendee_email)
             event = self.service.events().insert(calendarId=calendar_id, body=event).execute()
+            self._invalidate_busy(calendar_id, start_time, end_time)
             return event.get('id')
         
-        except HttpError as error:
-            print(f'An error occurred: {error}')
+        except HttpError:
+            logger.exception("Failed to create calendar event")
             return None
     
+    async def acreate_event(self, title: str, start_time: datetime, end_time: datetime,
+                            description: str = "", attendee_email: str = None,
+                            calendar_id: str = 'primary') -> Optional[str]:
+        """
+        Async version of create_event using the pooled HTTP client.
+        """
+        try:
+            event = self._event_body(title, start_time, end_time, description, attendee_email)
+            response = await self.http_client.post(
+                f'/calendars/{quote(calendar_id)}/events', json=event, headers=await self._auth_headers()
+            )
+            response.raise_for_status()
+            self._invalidate_busy(calendar_id, start_time, end_time)
+            return response.json().get('id')
+        
+        except httpx.HTTPError:
+            logger.exception("Failed to create calendar event")
+            return None
+    
+    def _event_body(self, title: str, start_time: datetime, end_time: datetime,
+                    description: str = "", attendee_email: str = None) -> Dict:
+        """Build the Calendar API event resource."""
+        event = {
+            'summary': title,
+            'description': description,
+            'start': {
+                'dateTime': start_time.isoformat(),
+                'timeZone': self.timezone_name,
+            },
+            'end': {
+                'dateTime': end_time.isoformat(),
+                'timeZone': self.timezone_name,
+            },
+            'reminders': {
+                'useDefault': False,
+                'overrides': [
+                    {'method': 'email', 'minutes': 24 * 60},
+                    {'method': 'popup', 'minutes': 10},
+                ],
+            },
+        }
+        
+        if attendee_email:
+            event['attendees'] = [{'email': attendee_email}]
+        
+        return event
+    
     def get_upcoming_events(self, max_results: int = 10, 
                           calendar_id: str = 'primary') -> List[Dict]:
         """
@@ -246,6 +510,6 @@ class GoogleCalendarService:
             
             return formatted_events
         
-        except HttpError as error:
-            print(f'An error occurred: {error}')
+        except HttpError:
+            logger.exception("Failed to fetch upcoming events")
             return []
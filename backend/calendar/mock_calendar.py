@@ -2,19 +2,29 @@
 Mock calendar service for testing without Google Calendar API.
 """
 
-from datetime import datetime, timedelta
+import logging
+import threading
+from bisect import bisect_right
+from datetime import datetime, time as dt_time, timedelta
 from typing import List, Dict, Optional, Tuple
-import pytz
 import random
 import uuid
 
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
 
 class MockCalendarService:
     """Mock calendar service that simulates Google Calendar functionality."""
     
     def __init__(self):
-        self.timezone = pytz.timezone('America/New_York')
-        self.events = []  # Store mock events
+        self.timezone = settings.TIMEZONE_OBJ
+        # Mock events sorted by start time, with their start times kept alongside for bisect
+        self.events: List[Dict] = []
+        self._event_starts: List[datetime] = []
+        # The API calls the calendar from worker threads; keeps the two lists in step
+        self._events_lock = threading.Lock()
     
     def get_free_busy(self, start_time: datetime, end_time: datetime, 
                       calendar_id: str = 'primary') -> List[Dict]:
@@ -39,10 +49,36 @@ class MockCalendarService:
         
         return busy_times
     
+    async def aget_free_busy(self, start_time: datetime, end_time: datetime,
+                             calendar_id: str = 'primary') -> List[Dict]:
+        """
+        Async version of get_free_busy (no I/O in the mock).
+        """
+        return self.get_free_busy(start_time, end_time, calendar_id)
+    
+    def freebusy_query(self, start_time: datetime, end_time: datetime,
+                       calendar_ids: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Mock busy periods for several calendars, sorted by start time.
+        """
+        busy_times = []
+        for calendar_id in calendar_ids or ['primary']:
+            busy_times.extend(self.get_free_busy(start_time, end_time, calendar_id))
+        
+        return sorted(busy_times, key=lambda busy: busy['start'])
+    
+    async def afreebusy_query(self, start_time: datetime, end_time: datetime,
+                              calendar_ids: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Async version of freebusy_query (no I/O in the mock).
+        """
+        return self.freebusy_query(start_time, end_time, calendar_ids)
+    
     def find_available_slots(self, start_date: datetime, end_date: datetime,
                            duration_minutes: int = 60, 
                            working_hours: Tuple[int, int] = (9, 17),
-                           calendar_id: str = 'primary') -> List[Dict]:
+                           calendar_id: str = 'primary',
+                           max_slots: int = settings.MAX_AVAILABLE_SLOTS) -> List[Dict]:
         """
         Find available time slots within a date range.
         """
@@ -51,36 +87,39 @@ class MockCalendarService:
         end_date_only = end_date.date()
         
         slot_count = 0
-        max_slots = 10
+        
+        # Loop invariants
+        slot_times = [dt_time(hour=hour) for hour in range(working_hours[0], working_hours[1], 2)]
+        slot_delta = timedelta(minutes=duration_minutes)
+        one_day = timedelta(days=1)
         
         while current_date <= end_date_only and slot_count < max_slots:
-            # Skip weekends
+            # Skip weekends by jumping straight to Monday
             if current_date.weekday() >= 5:  # Saturday = 5, Sunday = 6
-                current_date += timedelta(days=1)
+                current_date += timedelta(days=7 - current_date.weekday())
                 continue
             
             # Generate some available slots for each day
-            for hour in range(working_hours[0], working_hours[1], 2):
+            date_str = current_date.strftime('%Y-%m-%d')
+            for slot_time in slot_times:
                 if slot_count >= max_slots:
                     break
                 
                 # 70% chance of slot being available
                 if random.random() < 0.7:
-                    slot_start = self.timezone.localize(
-                        datetime.combine(current_date, datetime.min.time().replace(hour=hour))
-                    )
-                    slot_end = slot_start + timedelta(minutes=duration_minutes)
+                    slot_start = datetime.combine(current_date, slot_time, tzinfo=self.timezone)
+                    slot_end = slot_start + slot_delta
                     
                     available_slots.append({
                         'start': slot_start,
                         'end': slot_end,
-                        'date': current_date.strftime('%Y-%m-%d'),
+                        'date': date_str,
                         'start_time': slot_start.strftime('%I:%M %p'),
                         'end_time': slot_end.strftime('%I:%M %p')
                     })
                     slot_count += 1
             
-            current_date += timedelta(days=1)
+            current_date += one_day
         
         return available_slots
     
@@ -102,11 +141,24 @@ class MockCalendarService:
             'created_at': datetime.now()
         }
         
-        self.events.append(event)
-        print(f"📅 Mock event created: {title} on {start_time.strftime('%Y-%m-%d %H:%M')}")
+        # /book may pass naive times, the agents book aware slots; sort them all as aware
+        sort_key = start_time.replace(tzinfo=self.timezone) if start_time.tzinfo is None else start_time
+        with self._events_lock:
+            index = bisect_right(self._event_starts, sort_key)
+            self._event_starts.insert(index, sort_key)
+            self.events.insert(index, event)
+        logger.info("📅 Mock event created: %s on %s", title, start_time.strftime('%Y-%m-%d %H:%M'))
         
         return event_id
     
+    async def acreate_event(self, title: str, start_time: datetime, end_time: datetime,
+                            description: str = "", attendee_email: str = None,
+                            calendar_id: str = 'primary') -> Optional[str]:
+        """
+        Async version of create_event (no I/O in the mock).
+        """
+        return self.create_event(title, start_time, end_time, description, attendee_email, calendar_id)
+    
     def get_upcoming_events(self, max_results: int = 10, 
                           calendar_id: str = 'primary') -> List[Dict]:
         """
@@ -116,7 +168,8 @@ class MockCalendarService:
         upcoming_events = []
         
         # Add some mock upcoming events
-        for i in range(min(3, max_results)):
+        demo_count = min(3, max_results) if settings.MOCK_DEMO_EVENTS else 0
+        for i in range(demo_count):
             event_time = now + timedelta(days=i+1, hours=10+i*2)
             upcoming_events.append({
                 'id': f'mock_event_{i}',
@@ -125,14 +178,16 @@ class MockCalendarService:
                 'description': f'This is a mock event for testing purposes'
             })
         
-        # Add any created events
-        for event in self.events:
-            if event['start_time'] > now:
-                upcoming_events.append({
-                    'id': event['id'],
-                    'summary': event['title'],
-                    'start': event['start_time'].isoformat(),
-                    'description': event['description']
-                })
+        # Add created events that start after now, found by binary search
+        with self._events_lock:
+            first = bisect_right(self._event_starts, now)
+            created = self.events[first:first + max_results - len(upcoming_events)]
+        for event in created:
+            upcoming_events.append({
+                'id': event['id'],
+                'summary': event['title'],
+                'start': event['start_time'].isoformat(),
+                'description': event['description']
+            })
         
-        return upcoming_events[:max_results]
+        return upcoming_events
@@ -3,14 +3,22 @@ Configuration settings for the booking agent.
 """
 
 import os
+import sys
+from dataclasses import dataclass
 from typing import Tuple
+from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 
+# The only place .env is read; everything else goes through `settings`
 load_dotenv()
 
+# Slot-based attribute storage needs Python 3.10+
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class Settings:
-    """Application settings."""
+    """Application settings, read from the environment once at import."""
     
     # API Keys
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
@@ -27,10 +35,12 @@ class Settings:
     
     # Calendar Settings
     TIMEZONE: str = os.getenv("TIMEZONE", "America/New_York")
+    TIMEZONE_OBJ: ZoneInfo = ZoneInfo(TIMEZONE)  # Resolved once at import
     DEFAULT_MEETING_DURATION: int = 60  # minutes
     WORKING_HOURS: Tuple[int, int] = (9, 17)  # 9 AM to 5 PM
     MAX_AVAILABILITY_DAYS: int = 30  # Look ahead 30 days max
     MAX_AVAILABLE_SLOTS: int = 10  # Return max 10 available slots
+    MOCK_DEMO_EVENTS: bool = os.getenv("MOCK_DEMO_EVENTS", "true").lower() == "true"  # Placeholder events in mock mode
     
     # Agent Settings
     LLM_MODEL: str = "gpt-4o-mini"
@@ -39,12 +49,12 @@ class Settings:
     
     # Session Settings
     SESSION_TIMEOUT_HOURS: int = 24  # Sessions expire after 24 hours
+    MAX_SESSIONS: int = 10_000  # Least recently used sessions are evicted beyond this
     
-    @classmethod
-    def validate(cls) -> bool:
+    def validate(self) -> bool:
         """Validate required settings."""
         required_settings = [
-            ("OPENAI_API_KEY", cls.OPENAI_API_KEY),
+            ("OPENAI_API_KEY", self.OPENAI_API_KEY),
         ]
         
         missing = []
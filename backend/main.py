@@ -3,48 +3,64 @@ FastAPI backend for the AI Calendar Booking Agent.
 """
 
 import os
+import json
 import uuid
+import asyncio
+import logging
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, get_args
 
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from dotenv import load_dotenv
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
 
+# orjson serializes datetimes natively and much faster than the stdlib encoder
+try:
+    import orjson  # noqa: F401
+    DefaultResponse = ORJSONResponse
+except ImportError:
+    DefaultResponse = JSONResponse
+
+from backend.config import settings
+from backend.session_store import SessionStore, create_session_store
+from backend.models._prebuild import prebuild as prebuild_schemas
 from backend.models.schemas import (
-    ChatMessage, ChatResponse, BookingRequest, BookingResponse,
-    AvailabilityRequest, AvailabilityResponse
+    ChatMessage, ChatResponse, ChatBatchRequest, ChatBatchResponse, BookingRequest, BookingResponse,
+    AvailabilityRequest, AvailabilityResponse, ChatResponseField
+)
+
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
 )
+logger = logging.getLogger(__name__)
 
 # Try to import the full agent, fall back to simple agent
 try:
     from backend.agent.booking_agent import BookingAgent
     FULL_AGENT_AVAILABLE = True
 except ImportError as e:
-    print(f"⚠️  Full agent not available: {e}")
+    logger.warning("⚠️  Full agent not available: %s", e)
     FULL_AGENT_AVAILABLE = False
 
 from backend.agent.simple_agent import SimpleBookingAgent
 
 # Try to import Google Calendar, fall back to mock
 try:
-    from backend.calendar.google_calendar import GoogleCalendarService
+    from backend.calendar.google_calendar import GoogleCalendarService, close_http_client
     GOOGLE_CALENDAR_AVAILABLE = True
 except ImportError as e:
-    print(f"⚠️  Google Calendar not available: {e}")
+    logger.warning("⚠️  Google Calendar not available: %s", e)
     GOOGLE_CALENDAR_AVAILABLE = False
 
 from backend.calendar.mock_calendar import MockCalendarService
 
-# Load environment variables
-load_dotenv()
-
 # Initialize FastAPI app
 app = FastAPI(
     title="AI Calendar Booking Agent",
     description="A conversational AI agent for booking calendar appointments",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=DefaultResponse
 )
 
 # Add CORS middleware
@@ -60,8 +76,28 @@ app.add_middleware(
 booking_agent = None
 calendar_service = None
 
-# Session storage (in production, use Redis or database)
-sessions: Dict[str, Dict[str, Any]] = {}
+# Session storage (SQLite by default; see backend/session_store.py)
+session_store: SessionStore = create_session_store()
+
+
+def _trusted_response(model_cls, compact: bool = False, **fields) -> Response:
+    """
+    Serialize a server-built payload without re-validating it through the response model.
+    
+    With compact=True, fields that are None are left out; fields with a value,
+    including False, are always sent.
+    """
+    payload = model_cls.build_trusted(**fields).model_dump_json(exclude_none=compact)
+    return Response(content=payload, media_type="application/json")
+
+
+def _message(role: str, content: str) -> Dict[str, Any]:
+    """Session history entry, timestamped now."""
+    return {
+        "role": role,
+        "content": content,
+        "timestamp": datetime.utcnow().isoformat()
+    }
 
 
 @app.on_event("startup")
@@ -69,42 +105,53 @@ async def startup_event():
     """Initialize services on startup."""
     global booking_agent, calendar_service
 
+    # Build the deferred model schemas once per worker
+    prebuild_schemas()
+
     try:
         # Initialize calendar service
         if GOOGLE_CALENDAR_AVAILABLE and os.path.exists('credentials.json'):
             try:
                 calendar_service = GoogleCalendarService()
-                print("✅ Google Calendar service initialized")
+                logger.info("✅ Google Calendar service initialized")
             except Exception as e:
-                print(f"⚠️  Google Calendar failed, using mock: {e}")
+                logger.warning("⚠️  Google Calendar failed, using mock: %s", e)
                 calendar_service = MockCalendarService()
         else:
             calendar_service = MockCalendarService()
-            print("✅ Mock calendar service initialized")
+            logger.info("✅ Mock calendar service initialized")
 
         # Initialize booking agent
-        openai_key = os.getenv("OPENAI_API_KEY")
+        openai_key = settings.OPENAI_API_KEY
         if FULL_AGENT_AVAILABLE and openai_key and openai_key != "your_openai_api_key_here":
             try:
                 booking_agent = BookingAgent()
-                print("✅ Full AI agent initialized")
+                logger.info("✅ Full AI agent initialized")
             except Exception as e:
-                print(f"⚠️  Full agent failed, using simple agent: {e}")
+                logger.warning("⚠️  Full agent failed, using simple agent: %s", e)
                 booking_agent = SimpleBookingAgent()
         else:
             booking_agent = SimpleBookingAgent()
-            print("✅ Simple rule-based agent initialized")
+            logger.info("✅ Simple rule-based agent initialized")
             if not openai_key or openai_key == "your_openai_api_key_here":
-                print("💡 Add your OpenAI API key to .env for full AI capabilities")
+                logger.info("💡 Add your OpenAI API key to .env for full AI capabilities")
 
-        print("🚀 Backend services ready!")
+        logger.info("🚀 Backend services ready!")
 
     except Exception as e:
-        print(f"❌ Failed to initialize services: {e}")
+        logger.error("❌ Failed to initialize services: %s", e)
         # Initialize with fallback services
         booking_agent = SimpleBookingAgent()
         calendar_service = MockCalendarService()
-        print("🔄 Fallback services initialized")
+        logger.info("🔄 Fallback services initialized")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled connections on shutdown."""
+    if GOOGLE_CALENDAR_AVAILABLE:
+        await close_http_client()
+    await session_store.close()
 
 
 def get_booking_agent():
@@ -131,9 +178,9 @@ async def root():
     }
 
 
-@app.get("/health")
+@app.api_route("/health", methods=["GET", "HEAD"])
 async def health_check():
-    """Health check endpoint."""
+    """Health check endpoint; HEAD returns the status without the body."""
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
@@ -144,10 +191,10 @@ async def health_check():
     }
 
 
-@app.post("/chat", response_model=ChatResponse)
+@app.post("/chat", response_model=None, responses={200: {"model": ChatResponse}})
 async def chat(
     message: ChatMessage,
-    agent: BookingAgent = Depends(get_booking_agent)
+    agent: Any = Depends(get_booking_agent)
 ):
     """
     Main chat endpoint for conversing with the booking agent.
@@ -155,55 +202,132 @@ async def chat(
     try:
         # Generate session ID if not provided
         session_id = message.session_id or str(uuid.uuid4())
-        
-        # Initialize session if new
-        if session_id not in sessions:
-            sessions[session_id] = {
-                "created_at": datetime.utcnow(),
-                "messages": [],
-                "state": "active"
-            }
-        
-        # Add user message to session
-        sessions[session_id]["messages"].append({
-            "role": "user",
-            "content": message.message,
-            "timestamp": datetime.utcnow().isoformat()
-        })
-        
-        # Process message with agent
-        result = agent.process_message(message.message, session_id)
-        
-        # Add agent response to session
-        sessions[session_id]["messages"].append({
-            "role": "assistant",
-            "content": result["response"],
-            "timestamp": datetime.utcnow().isoformat()
-        })
-        
-        return ChatResponse(
-            response=result["response"],
-            session_id=session_id,
-            intent=result.get("intent"),
-            extracted_info=result.get("extracted_info"),
-            available_slots=result.get("available_slots"),
-            booking_confirmed=result.get("booking_confirmed", False)
-        )
+        fields = _only_included(await _run_turn(agent, session_id, message.message), message.include)
+        return _trusted_response(ChatResponse, compact=True, **fields)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing message: {str(e)}")
 
 
-@app.post("/book", response_model=BookingResponse)
+@app.post("/chat/batch", response_model=None, responses={200: {"model": ChatBatchResponse}})
+async def chat_batch(
+    batch: ChatBatchRequest,
+    agent: Any = Depends(get_booking_agent)
+):
+    """
+    Process several messages for one session in a single request.
+    
+    Turns run in order, since each depends on the one before it; this saves
+    the client a round trip per scripted turn.
+    """
+    try:
+        session_id = batch.session_id or str(uuid.uuid4())
+        responses = [
+            ChatResponse.build_trusted(**_only_included(await _run_turn(agent, session_id, text), batch.include))
+            for text in batch.messages
+        ]
+        return _trusted_response(ChatBatchResponse, compact=True, session_id=session_id, responses=responses)
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing messages: {str(e)}")
+
+
+async def _run_turn(agent, session_id: str, text: str) -> Dict[str, Any]:
+    """Run one conversation turn, record it in the session, and return the ChatResponse fields."""
+    user_message = _message("user", text)
+    
+    # Process message with agent
+    if hasattr(agent, "aprocess_message"):
+        result = await agent.aprocess_message(text, session_id)
+    else:
+        # The rule-based agent does no I/O, and its session cache is not thread-safe
+        result = agent.process_message(text, session_id)
+    
+    # Record the exchange in one atomic append (creates the session if new)
+    await session_store.append(session_id, [user_message, _message("assistant", result["response"])])
+    
+    return {
+        "response": result["response"],
+        "session_id": session_id,
+        "intent": result.get("intent"),
+        "extracted_info": result.get("extracted_info"),
+        "available_slots": result.get("available_slots"),
+        "booking_confirmed": result.get("booking_confirmed", False)
+    }
+
+
+def _only_included(fields: Dict[str, Any], include) -> Dict[str, Any]:
+    """
+    Blank out optional ChatResponse fields the client did not ask for (None means all).
+    
+    response, session_id and booking_confirmed are not optional and always go out.
+    """
+    if include is None:
+        return fields
+    return {**fields, **{name: None for name in get_args(ChatResponseField) if name not in include}}
+
+
+@app.post("/chat/stream")
+async def chat_stream(
+    message: ChatMessage,
+    agent: Any = Depends(get_booking_agent)
+):
+    """
+    Streaming chat endpoint (Server-Sent Events).
+    
+    Emits "token" events as the reply is generated and a final "done" event
+    with the same fields as /chat.
+    """
+    session_id = message.session_id or str(uuid.uuid4())
+    user_message = _message("user", message.message)
+    
+    async def event_stream():
+        try:
+            if hasattr(agent, "astream_message"):
+                events = agent.astream_message(message.message, session_id)
+            else:
+                # Rule-based agent has no tokens to stream; send the result at once
+                async def single_result():
+                    result = agent.process_message(message.message, session_id)
+                    yield {"type": "done", "result": result}
+                events = single_result()
+            
+            async for event in events:
+                if event["type"] == "done":
+                    result = event["result"]
+                    await session_store.append(
+                        session_id, [user_message, _message("assistant", result["response"])]
+                    )
+                    payload = ChatResponse.build_trusted(**_only_included({
+                        "response": result["response"],
+                        "session_id": session_id,
+                        "intent": result.get("intent"),
+                        "extracted_info": result.get("extracted_info"),
+                        "available_slots": result.get("available_slots"),
+                        "booking_confirmed": result.get("booking_confirmed", False)
+                    }, message.include)).model_dump_json(exclude_none=True)
+                    yield f"event: done\ndata: {payload}\n\n"
+                else:
+                    yield f"event: token\ndata: {json.dumps(event['content'])}\n\n"
+        
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': f'Error processing message: {str(e)}'})}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@app.post("/book", response_model=None, responses={200: {"model": BookingResponse}})
 async def book_appointment(
     booking: BookingRequest,
-    calendar: GoogleCalendarService = Depends(get_calendar_service)
+    calendar: Any = Depends(get_calendar_service)
 ):
     """
     Direct booking endpoint for creating calendar events.
     """
     try:
-        event_id = calendar.create_event(
+        # Calendar clients block; keep them off the event loop
+        event_id = await asyncio.to_thread(
+            calendar.create_event,
             title=booking.title,
             start_time=booking.start_time,
             end_time=booking.end_time,
@@ -212,13 +336,15 @@ async def book_appointment(
         )
         
         if event_id:
-            return BookingResponse(
+            return _trusted_response(
+                BookingResponse,
                 success=True,
                 event_id=event_id,
                 message="Appointment booked successfully!"
             )
         else:
-            return BookingResponse(
+            return _trusted_response(
+                BookingResponse,
                 success=False,
                 message="Failed to create calendar event"
             )
@@ -227,22 +353,24 @@ async def book_appointment(
         raise HTTPException(status_code=500, detail=f"Error booking appointment: {str(e)}")
 
 
-@app.post("/availability", response_model=AvailabilityResponse)
+@app.post("/availability", response_model=None, responses={200: {"model": AvailabilityResponse}})
 async def check_availability(
     request: AvailabilityRequest,
-    calendar: GoogleCalendarService = Depends(get_calendar_service)
+    calendar: Any = Depends(get_calendar_service)
 ):
     """
     Check calendar availability for a given date range.
     """
     try:
-        available_slots = calendar.find_available_slots(
+        available_slots = await asyncio.to_thread(
+            calendar.find_available_slots,
             start_date=request.start_date,
             end_date=request.end_date,
             duration_minutes=request.duration_minutes
         )
         
-        return AvailabilityResponse(
+        return _trusted_response(
+            AvailabilityResponse,
             available_slots=available_slots,
             message=f"Found {len(available_slots)} available slots"
         )
@@ -256,10 +384,11 @@ async def get_session(session_id: str):
     """
     Get session information and conversation history.
     """
-    if session_id not in sessions:
+    session = await session_store.get(session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    return sessions[session_id]
+    return session
 
 
 @app.delete("/sessions/{session_id}")
@@ -267,10 +396,9 @@ async def delete_session(session_id: str):
     """
     Delete a session and its conversation history.
     """
-    if session_id not in sessions:
+    if not await session_store.delete(session_id):
         raise HTTPException(status_code=404, detail="Session not found")
     
-    del sessions[session_id]
     return {"message": "Session deleted successfully"}
 
 
@@ -279,22 +407,23 @@ async def list_sessions():
     """
     List all active sessions.
     """
+    session_ids = await session_store.keys()
     return {
-        "sessions": list(sessions.keys()),
-        "total": len(sessions)
+        "sessions": session_ids,
+        "total": len(session_ids)
     }
 
 
 @app.get("/events")
 async def get_upcoming_events(
     max_results: int = 10,
-    calendar: GoogleCalendarService = Depends(get_calendar_service)
+    calendar: Any = Depends(get_calendar_service)
 ):
     """
     Get upcoming calendar events.
     """
     try:
-        events = calendar.get_upcoming_events(max_results=max_results)
+        events = await asyncio.to_thread(calendar.get_upcoming_events, max_results=max_results)
         return {
             "events": events,
             "total": len(events)
@@ -307,7 +436,7 @@ async def get_upcoming_events(
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler."""
-    return JSONResponse(
+    return DefaultResponse(
         status_code=500,
         content={
             "error": "Internal server error",
@@ -320,13 +449,10 @@ async def global_exception_handler(request, exc):
 if __name__ == "__main__":
     import uvicorn
     
-    host = os.getenv("FASTAPI_HOST", "localhost")
-    port = int(os.getenv("FASTAPI_PORT", 8000))
-    
     uvicorn.run(
         "backend.main:app",
-        host=host,
-        port=port,
+        host=settings.FASTAPI_HOST,
+        port=settings.FASTAPI_PORT,
         reload=True,
         log_level="info"
     )
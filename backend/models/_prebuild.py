@@ -0,0 +1,25 @@
+"""
+One-time schema build for the API models.
+
+The models in schemas.py use defer_build, so importing them (e.g. from the
+agents or scripts) does not pay for core schema generation. The server calls
+prebuild() once per worker at startup so the first request does not pay for
+it either.
+"""
+
+from backend.models.schemas import (
+    ChatMessage, ChatResponse, ChatBatchRequest, ChatBatchResponse, BookingRequest,
+    BookingResponse, AvailabilityRequest, AvailabilityResponse, ConversationState
+)
+
+MODELS = (
+    ChatMessage, ChatResponse, ChatBatchRequest, ChatBatchResponse, BookingRequest,
+    BookingResponse, AvailabilityRequest, AvailabilityResponse, ConversationState
+)
+
+
+def prebuild() -> None:
+    """Build any model schemas that are still deferred."""
+    for model in MODELS:
+        if not getattr(model, '__pydantic_complete__', False):
+            model.model_rebuild(force=True)
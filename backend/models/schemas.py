@@ -2,29 +2,111 @@
 Pydantic models for the booking agent API.
 """
 
+import sys
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Literal, Sequence
+from typing_extensions import NotRequired, TypedDict
+from pydantic import BaseModel, ConfigDict, Field
+
+
+# Typed dicts give pydantic-core a concrete schema per item while the agents keep
+# working with plain dicts (slot['start'], extracted_info.get('title'), ...).
+
+class Slot(TypedDict):
+    """An available time slot."""
+    start: datetime
+    end: datetime
+    date: str
+    start_time: str
+    end_time: str
+
+
+class ExtractedInfo(TypedDict, total=False):
+    """Booking details extracted from the conversation."""
+    date: Optional[str]
+    time: Optional[str]
+    duration: Optional[int]
+    title: Optional[str]
+    description: Optional[str]
+    attendee_email: Optional[str]
+    event_id: Optional[str]
+
+
+class HistoryEntry(TypedDict):
+    """A single conversation message."""
+    role: Literal["user", "assistant"]
+    content: str
+    timestamp: NotRequired[datetime]
+
+
+# Shared by every model: schemas build on first use (see _prebuild.py)
+MODEL_CONFIG = ConfigDict(defer_build=True)
+
+
+# Shared empty default for list fields that are only ever replaced, never appended to,
+# so state objects don't allocate a list they may never use
+_EMPTY_LIST: tuple = ()
+
+
+class TrustedModel(BaseModel):
+    """Base for models the server builds from its own data."""
+    model_config = MODEL_CONFIG
+    
+    @classmethod
+    def build_trusted(cls, **fields):
+        """Construct without validation; only for data produced by the backend itself."""
+        return cls.model_construct(**fields)
+
+
+class ResponseModel(TrustedModel):
+    """Base for write-once response payloads."""
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
+
+# Optional ChatResponse fields a client can ask for; the rest are always sent
+ChatResponseField = Literal["intent", "extracted_info", "available_slots"]
 
 
 class ChatMessage(BaseModel):
     """Chat message model."""
+    model_config = MODEL_CONFIG
     message: str = Field(..., description="User message")
     session_id: Optional[str] = Field(None, description="Session ID for conversation tracking")
+    include: Optional[List[ChatResponseField]] = Field(
+        None, description="Optional response fields to return (default: all)"
+    )
 
 
-class ChatResponse(BaseModel):
+class ChatResponse(ResponseModel):
     """Chat response model."""
     response: str = Field(..., description="Agent response")
     session_id: str = Field(..., description="Session ID")
     intent: Optional[str] = Field(None, description="Detected intent")
-    extracted_info: Optional[Dict[str, Any]] = Field(None, description="Extracted booking information")
-    available_slots: Optional[List[Dict]] = Field(None, description="Available time slots")
+    extracted_info: Optional[ExtractedInfo] = Field(None, description="Extracted booking information")
+    available_slots: Optional[List[Slot]] = Field(None, description="Available time slots")
     booking_confirmed: bool = Field(False, description="Whether booking was confirmed")
 
 
+class ChatBatchRequest(BaseModel):
+    """Several messages for one session, processed in order."""
+    model_config = MODEL_CONFIG
+    messages: List[str] = Field(..., description="User messages, in conversation order")
+    session_id: Optional[str] = Field(None, description="Session ID for conversation tracking")
+    include: Optional[List[ChatResponseField]] = Field(
+        None, description="Optional response fields to return for each message (default: all)"
+    )
+
+
+class ChatBatchResponse(ResponseModel):
+    """Responses for a batch of chat messages."""
+    session_id: str = Field(..., description="Session ID")
+    responses: List[ChatResponse] = Field(..., description="One response per message, in order")
+
+
 class BookingRequest(BaseModel):
     """Booking request model."""
+    model_config = MODEL_CONFIG
     title: str = Field(..., description="Meeting title")
     start_time: datetime = Field(..., description="Meeting start time")
     end_time: datetime = Field(..., description="Meeting end time")
@@ -32,7 +114,7 @@ class BookingRequest(BaseModel):
     attendee_email: Optional[str] = Field(None, description="Attendee email")
 
 
-class BookingResponse(BaseModel):
+class BookingResponse(ResponseModel):
     """Booking response model."""
     success: bool = Field(..., description="Whether booking was successful")
     event_id: Optional[str] = Field(None, description="Created event ID")
@@ -41,37 +123,54 @@ class BookingResponse(BaseModel):
 
 class AvailabilityRequest(BaseModel):
     """Availability request model."""
+    model_config = MODEL_CONFIG
     start_date: datetime = Field(..., description="Start date for availability check")
     end_date: datetime = Field(..., description="End date for availability check")
     duration_minutes: int = Field(60, description="Meeting duration in minutes")
 
 
-class AvailabilityResponse(BaseModel):
+class AvailabilityResponse(ResponseModel):
     """Availability response model."""
-    available_slots: List[Dict] = Field(..., description="List of available time slots")
+    available_slots: List[Slot] = Field(..., description="List of available time slots")
     message: str = Field(..., description="Response message")
 
 
-class ConversationState(BaseModel):
+class ConversationState(TrustedModel):
     """Conversation state model for tracking booking progress."""
     session_id: str
     intent: Optional[str] = None
-    extracted_info: Dict[str, Any] = Field(default_factory=dict)
+    extracted_info: ExtractedInfo = Field(default_factory=dict)
     current_step: str = "greeting"  # greeting, collecting_info, showing_availability, confirming, completed
-    available_slots: List[Dict] = Field(default_factory=list)
-    selected_slot: Optional[Dict] = None
+    available_slots: Sequence[Slot] = _EMPTY_LIST
+    selected_slot: Optional[Slot] = None
     booking_details: Optional[Dict] = None
-    conversation_history: List[Dict] = Field(default_factory=list)
+    conversation_history: Sequence[HistoryEntry] = _EMPTY_LIST
+
+
+# Slot-based attribute storage needs Python 3.10+
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
 
-class AgentState(BaseModel):
-    """State model for LangGraph agent."""
-    messages: List[Dict] = Field(default_factory=list)
+@dataclass(**_DATACLASS_SLOTS)
+class AgentState:
+    """
+    State for the LangGraph agent.
+    
+    A plain dataclass rather than a pydantic model: it never comes from user
+    input and is rebuilt by the graph between every node, so validation
+    would only add cost.
+    """
     session_id: str
+    messages: Sequence[HistoryEntry] = _EMPTY_LIST
     intent: Optional[str] = None
-    extracted_info: Dict[str, Any] = Field(default_factory=dict)
+    extracted_info: ExtractedInfo = field(default_factory=dict)
     current_step: str = "greeting"
-    available_slots: List[Dict] = Field(default_factory=list)
-    selected_slot: Optional[Dict] = None
+    available_slots: Sequence[Slot] = _EMPTY_LIST
+    selected_slot: Optional[Slot] = None
     booking_confirmed: bool = False
     final_response: Optional[str] = None
+    
+    @classmethod
+    def build_trusted(cls, **fields) -> "AgentState":
+        """Same constructor as the API models use for server-built data."""
+        return cls(**fields)
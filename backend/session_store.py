@@ -0,0 +1,285 @@
+"""
+Session storage for the FastAPI backend.
+
+Records are plain JSON-serializable dicts ({"created_at", "messages", "state"}).
+The store is picked from SESSION_STORE: "sqlite" (default), "redis" or "memory".
+Turns are recorded with append(), which is atomic in every store, so concurrent
+requests for one session (e.g. on different workers) never drop each other's messages.
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+SESSION_TTL_SECONDS = settings.SESSION_TIMEOUT_HOURS * 3600
+
+
+def new_record() -> Dict[str, Any]:
+    """Empty session record."""
+    return {
+        "created_at": datetime.utcnow().isoformat(),
+        "messages": [],
+        "state": "active"
+    }
+
+
+def _appended(record: Optional[Dict[str, Any]], messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Record (a new one if None) with messages added at the end, trimmed to the history limit."""
+    record = record or new_record()
+    return _trim({**record, "messages": list(record.get("messages", [])) + list(messages)})
+
+
+def _trim(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the most recent messages of a record."""
+    messages = record.get("messages", [])
+    if len(messages) > settings.MAX_CONVERSATION_HISTORY:
+        record = {**record, "messages": list(messages)[-settings.MAX_CONVERSATION_HISTORY:]}
+    return record
+
+
+class SessionStore(ABC):
+    """Interface shared by the session backends."""
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def put(self, session_id: str, record: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    async def append(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        """Atomically add messages to a session, creating it if needed."""
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def keys(self) -> List[str]:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    """In-process LRU store with a TTL; lost on restart."""
+
+    def __init__(self, max_sessions: int = settings.MAX_SESSIONS, ttl: int = SESSION_TTL_SECONDS):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        # session_id -> (expires_at, record), least recently used first
+        self._records: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._records.get(session_id)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._records[session_id]
+            return None
+        self._records.move_to_end(session_id)
+        return entry[1]
+
+    async def put(self, session_id: str, record: Dict[str, Any]) -> None:
+        self._records[session_id] = (time.monotonic() + self.ttl, _trim(record))
+        self._records.move_to_end(session_id)
+        # Drop expired sessions and the least recently used beyond max_sessions
+        now = time.monotonic()
+        while self._records:
+            oldest_id, (expires_at, _) = next(iter(self._records.items()))
+            if len(self._records) <= self.max_sessions and expires_at >= now:
+                break
+            del self._records[oldest_id]
+
+    async def append(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        # get() and put() never yield to the event loop, so nothing can run in between
+        await self.put(session_id, _appended(await self.get(session_id), messages))
+
+    async def delete(self, session_id: str) -> bool:
+        return self._records.pop(session_id, None) is not None
+
+    async def keys(self) -> List[str]:
+        now = time.monotonic()
+        return [session_id for session_id, (expires_at, _) in self._records.items() if expires_at >= now]
+
+
+class SQLiteSessionStore(SessionStore):
+    """Single-file store in WAL mode; survives reloads and is shared by local workers."""
+
+    def __init__(self, path: str, ttl: int = SESSION_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, record TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params).fetchall()
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT record FROM sessions WHERE session_id = ? AND expires_at >= ?",
+            (session_id, time.time())
+        )
+        return _json_loads(rows[0][0]) if rows else None
+
+    async def put(self, session_id: str, record: Dict[str, Any]) -> None:
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT OR REPLACE INTO sessions (session_id, record, expires_at) VALUES (?, ?, ?)",
+            (session_id, _json_dumps(_trim(record)), time.time() + self.ttl)
+        )
+
+    def _append_locked(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        """Read-modify-write in one write transaction, so other workers wait their turn."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            rows = self._conn.execute(
+                "SELECT record FROM sessions WHERE session_id = ? AND expires_at >= ?", (session_id, now)
+            ).fetchall()
+            record = _appended(_json_loads(rows[0][0]) if rows else None, messages)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, record, expires_at) VALUES (?, ?, ?)",
+                (session_id, _json_dumps(record), now + self.ttl)
+            )
+
+    async def append(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        await asyncio.to_thread(self._append_locked, session_id, messages)
+
+    async def delete(self, session_id: str) -> bool:
+        existed = await self.get(session_id) is not None
+        await asyncio.to_thread(self._execute, "DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        return existed
+
+    async def keys(self) -> List[str]:
+        now = time.time()
+        await asyncio.to_thread(self._execute, "DELETE FROM sessions WHERE expires_at < ?", (now,))
+        rows = await asyncio.to_thread(self._execute, "SELECT session_id FROM sessions")
+        return [row[0] for row in rows]
+
+    async def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Redis store; expiry is handled by Redis.
+
+    A record's messages live in their own list (session-messages:<id>) next to the
+    rest of the record (session:<id>), so append() is one RPUSH + LTRIM transaction.
+    """
+
+    PREFIX = "session:"
+    MESSAGES_PREFIX = "session-messages:"
+
+    def __init__(self, url: str, ttl: int = SESSION_TTL_SECONDS):
+        import redis.asyncio as redis
+        self.ttl = ttl
+        self._redis = redis.Redis.from_url(url)
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        raw, messages = await (
+            self._redis.pipeline(transaction=True)
+            .get(self.PREFIX + session_id)
+            .lrange(self.MESSAGES_PREFIX + session_id, 0, -1)
+            .execute()
+        )
+        if not raw:
+            return None
+        return {**_json_loads(raw), "messages": [_json_loads(message) for message in messages]}
+
+    async def put(self, session_id: str, record: Dict[str, Any]) -> None:
+        record = _trim(record)
+        metadata = {key: value for key, value in record.items() if key != "messages"}
+        messages_key = self.MESSAGES_PREFIX + session_id
+
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.set(self.PREFIX + session_id, _json_dumps(metadata), ex=self.ttl)
+        pipe.delete(messages_key)
+        if record.get("messages"):
+            pipe.rpush(messages_key, *(_json_dumps(message) for message in record["messages"]))
+            pipe.expire(messages_key, self.ttl)
+        await pipe.execute()
+
+    async def append(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        if not messages:
+            return
+        record_key, messages_key = self.PREFIX + session_id, self.MESSAGES_PREFIX + session_id
+        metadata = {key: value for key, value in new_record().items() if key != "messages"}
+        await (
+            self._redis.pipeline(transaction=True)
+            .set(record_key, _json_dumps(metadata), ex=self.ttl, nx=True)
+            .expire(record_key, self.ttl)
+            .rpush(messages_key, *(_json_dumps(message) for message in messages))
+            .ltrim(messages_key, -settings.MAX_CONVERSATION_HISTORY, -1)
+            .expire(messages_key, self.ttl)
+            .execute()
+        )
+
+    async def delete(self, session_id: str) -> bool:
+        deleted, _ = await (
+            self._redis.pipeline(transaction=True)
+            .delete(self.PREFIX + session_id)
+            .delete(self.MESSAGES_PREFIX + session_id)
+            .execute()
+        )
+        return bool(deleted)
+
+    async def keys(self) -> List[str]:
+        return [
+            key.decode()[len(self.PREFIX):]
+            async for key in self._redis.scan_iter(match=self.PREFIX + "*")
+        ]
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def create_session_store() -> SessionStore:
+    """Build the session store configured by the environment."""
+    backend = os.getenv("SESSION_STORE", "sqlite").lower()
+
+    if backend == "redis":
+        try:
+            return RedisSessionStore(os.getenv("SESSION_REDIS_URL", "redis://localhost:6379"))
+        except ImportError as e:
+            logger.warning("⚠️  Redis not available for sessions, using SQLite: %s", e)
+            backend = "sqlite"
+
+    if backend == "sqlite":
+        return SQLiteSessionStore(os.getenv("SESSION_DB_PATH", ".sessions.db"))
+
+    return MemorySessionStore()
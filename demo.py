@@ -1,23 +1,45 @@
 """
 Demo script for the AI Calendar Booking Agent.
 Shows example conversations and capabilities.
+Pass --concurrent to send the independent edge cases in parallel.
 """
 
 import os
 import sys
+import json
 import time
+import uuid
+import asyncio
+import httpx
 import requests
-from datetime import datetime
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from datetime import datetime, timedelta
+
+# orjson is much faster than the stdlib encoder; fall back to json when it isn't installed
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+JSON_HEADERS = {"Content-Type": "application/json"}
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 API_BASE_URL = "http://localhost:8000"
 
+# One pooled connection for every demo call instead of a new socket per request
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
 def check_api_status():
     """Check if the API is running."""
     try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=5)
+        response = SESSION.head(f"{API_BASE_URL}/health", timeout=5, allow_redirects=False)
         return response.status_code == 200
     except requests.exceptions.RequestException:
         return False
@@ -30,20 +52,39 @@ def send_message(message: str, session_id: str = "demo_session"):
             "session_id": session_id
         }
         
-        response = requests.post(
+        response = SESSION.post(
             f"{API_BASE_URL}/chat",
-            json=payload,
+            data=_json_dumps(payload),
+            headers=JSON_HEADERS,
             timeout=30
         )
         
         if response.status_code == 200:
-            return response.json()
+            return _json_loads(response.content)
         else:
             return {"response": f"Error: {response.status_code}"}
     
     except requests.exceptions.RequestException as e:
         return {"response": f"Connection error: {e}"}
 
+def send_messages_batch(messages: list, session_id: str = "demo_session"):
+    """Send a scripted conversation in one request; returns one response per message."""
+    try:
+        response = SESSION.post(
+            f"{API_BASE_URL}/chat/batch",
+            data=_json_dumps({"messages": messages, "session_id": session_id}),
+            headers=JSON_HEADERS,
+            timeout=30 * len(messages)
+        )
+        
+        if response.status_code == 200:
+            return _json_loads(response.content)["responses"]
+        else:
+            return [{"response": f"Error: {response.status_code}"}] * len(messages)
+    
+    except requests.exceptions.RequestException as e:
+        return [{"response": f"Connection error: {e}"}] * len(messages)
+
 def print_conversation_step(user_msg: str, agent_response: dict, delay: float = 1.0):
     """Print a conversation step with typing effect."""
     print(f"\n👤 You: {user_msg}")
@@ -78,8 +119,7 @@ def demo_conversation_1():
         "Yes, please book it!"
     ]
     
-    for message in conversation:
-        response = send_message(message, session_id)
+    for message, response in zip(conversation, send_messages_batch(conversation, session_id)):
         print_conversation_step(message, response)
 
 def demo_conversation_2():
@@ -96,8 +136,7 @@ def demo_conversation_2():
         "Perfect, let's confirm that slot"
     ]
     
-    for message in conversation:
-        response = send_message(message, session_id)
+    for message, response in zip(conversation, send_messages_batch(conversation, session_id)):
         print_conversation_step(message, response)
 
 def demo_conversation_3():
@@ -115,11 +154,30 @@ def demo_conversation_3():
         "The 10 AM slot works perfectly"
     ]
     
-    for message in conversation:
-        response = send_message(message, session_id)
+    for message, response in zip(conversation, send_messages_batch(conversation, session_id)):
         print_conversation_step(message, response)
 
-def demo_edge_cases():
+async def send_messages_concurrently(messages: list, session_ids: list) -> list:
+    """Send independent messages at once; returns responses in the same order."""
+    async def post(client: httpx.AsyncClient, message: str, session_id: str):
+        try:
+            response = await client.post(
+                "/chat",
+                content=_json_dumps({"message": message, "session_id": session_id}),
+                headers=JSON_HEADERS
+            )
+            if response.status_code == 200:
+                return _json_loads(response.content)
+            return {"response": f"Error: {response.status_code}"}
+        except httpx.HTTPError as e:
+            return {"response": f"Connection error: {e}"}
+    
+    async with httpx.AsyncClient(base_url=API_BASE_URL, timeout=30) as client:
+        return await asyncio.gather(*[
+            post(client, message, session_id) for message, session_id in zip(messages, session_ids)
+        ])
+
+def demo_edge_cases(concurrent: bool = False):
     """Demo: Edge cases and error handling."""
     print("\n" + "="*60)
     print("🎬 DEMO 4: Edge Cases & Error Handling")
@@ -132,12 +190,53 @@ def demo_edge_cases():
         ("Cancellation", "Actually, never mind, cancel that"),
     ]
     
-    for case_name, message in edge_cases:
+    # One unique prefix for the run; each case still gets its own session
+    base = f"demo_edge_{uuid.uuid4().hex[:8]}"
+    
+    if concurrent:
+        # The cases are independent, so send them all at once and print afterwards
+        responses = asyncio.run(send_messages_concurrently(
+            [message for _, message in edge_cases],
+            [f"{base}_{i}" for i in range(len(edge_cases))]
+        ))
+        for (case_name, message), response in zip(edge_cases, responses):
+            print(f"\n🔍 Testing: {case_name}")
+            print_conversation_step(message, response, delay=0)
+        return
+    
+    for i, (case_name, message) in enumerate(edge_cases):
         print(f"\n🔍 Testing: {case_name}")
-        session_id = f"demo_edge_{int(datetime.now().timestamp())}"
-        response = send_message(message, session_id)
+        response = send_message(message, f"{base}_{i}")
         print_conversation_step(message, response, delay=0.5)
 
+@lru_cache(maxsize=128)
+def _iso_offset(days: int, bucket_s: int) -> str:
+    """ISO timestamp `days` from now; bucket_s only keys the cache."""
+    return (datetime.now() + timedelta(days=days)).isoformat()
+
+def iso_offset(days: int) -> str:
+    """ISO timestamp `days` from now, recomputed at most once a minute."""
+    return _iso_offset(days, int(time.time()) // 60)
+
+@lru_cache(maxsize=32)
+def probe_availability(start_date: str, end_date: str, duration_minutes: int):
+    """Count available slots in a range; memoized per (range, duration)."""
+    availability_payload = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "duration_minutes": duration_minutes
+    }
+    
+    availability_response = SESSION.post(
+        f"{API_BASE_URL}/availability", 
+        data=_json_dumps(availability_payload),
+        headers=JSON_HEADERS
+    )
+    
+    if availability_response.status_code == 200:
+        return len(_json_loads(availability_response.content).get('available_slots', []))
+    return None
+
 def show_api_info():
     """Show API information."""
     print("\n" + "="*60)
@@ -146,29 +245,16 @@ def show_api_info():
     
     try:
         # Health check
-        health_response = requests.get(f"{API_BASE_URL}/health")
+        health_response = SESSION.get(f"{API_BASE_URL}/health")
         if health_response.status_code == 200:
-            health_data = health_response.json()
+            health_data = _json_loads(health_response.content)
             print("✅ Backend Status: Healthy")
             print(f"   Timestamp: {health_data.get('timestamp', 'N/A')}")
             print(f"   Services: {health_data.get('services', {})}")
         
         # Check availability endpoint
-        from datetime import timedelta
-        availability_payload = {
-            "start_date": (datetime.now() + timedelta(days=1)).isoformat(),
-            "end_date": (datetime.now() + timedelta(days=7)).isoformat(),
-            "duration_minutes": 60
-        }
-        
-        availability_response = requests.post(
-            f"{API_BASE_URL}/availability", 
-            json=availability_payload
-        )
-        
-        if availability_response.status_code == 200:
-            availability_data = availability_response.json()
-            slots_count = len(availability_data.get('available_slots', []))
+        slots_count = probe_availability(iso_offset(1), iso_offset(7), 60)
+        if slots_count is not None:
             print(f"📅 Available Slots: {slots_count} found for next week")
         
     except Exception as e:
@@ -197,7 +283,7 @@ def main():
         demo_conversation_1()
         demo_conversation_2()
         demo_conversation_3()
-        demo_edge_cases()
+        demo_edge_cases(concurrent="--concurrent" in sys.argv)
         
         print("\n" + "="*60)
         print("🎉 DEMO COMPLETED!")
@@ -0,0 +1,206 @@
+"""
+Shared pieces of the Streamlit frontends (app.py, app_colored.py and app_v2.py).
+
+Each app keeps only its own rendering helpers and main(); backend access,
+session state and the sidebar live here so every entrypoint shares the same
+cached HTTP clients.
+"""
+
+from __future__ import annotations
+
+import os
+import json
+import secrets
+
+from collections.abc import Iterator
+
+import httpx
+import streamlit as st
+
+# orjson is much faster than the stdlib encoder; fall back to json when it isn't installed
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Optional reply fields the UI uses; all of them come back in the one /chat call
+RESPONSE_FIELDS = ["intent", "extracted_info", "available_slots"]
+
+# HTTP/2 needs the optional h2 package (httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Configuration
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+
+# Sidebar example messages with fixed widget keys
+EXAMPLE_MESSAGES = (
+    ("example_0", "Hi, I'd like to schedule a meeting"),
+    ("example_1", "Do you have any free time tomorrow afternoon?"),
+    ("example_2", "Book a 30-minute call for next Friday"),
+    ("example_3", "I need to schedule a team meeting for next week"),
+)
+
+# Chat history beyond this many messages is only rendered on request
+RECENT_MESSAGES = 30
+
+def configure_page():
+    """Page configuration; must be the first Streamlit call of a run."""
+    st.set_page_config(
+        page_title="AI Calendar Booking Agent",
+        page_icon="📅",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
+@st.cache_resource
+def get_client() -> httpx.Client:
+    """Pooled HTTP client for every backend call, shared across Streamlit reruns."""
+    # HTTP/2 is negotiated over TLS; against plain http:// the client stays on HTTP/1.1 keep-alive
+    return httpx.Client(
+        http2=HTTP2_AVAILABLE, base_url=API_BASE_URL, timeout=30,
+        limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
+    )
+
+def new_session_id() -> str:
+    """Random 128-bit session id (hex), without building a UUID object."""
+    return secrets.token_hex(16)
+
+def initialize_session_state():
+    """Initialize Streamlit session state variables."""
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = new_session_id()
+    
+    if "messages" not in st.session_state:
+        st.session_state.messages = []
+
+def visible_history() -> list[dict]:
+    """
+    Messages to render this run: the most recent RECENT_MESSAGES, plus the
+    older ones only while the user has asked to see them.
+    
+    A collapsed st.expander would still build its contents on every run,
+    so older messages sit behind a checkbox instead.
+    """
+    messages = st.session_state.messages
+    older_count = len(messages) - RECENT_MESSAGES
+    if older_count <= 0:
+        return messages
+    if st.checkbox(f"Show {older_count} older messages", key="show_older_messages"):
+        return messages
+    return messages[-RECENT_MESSAGES:]
+
+@st.cache_data(ttl=10, show_spinner=False)
+def check_api_status() -> bool:
+    """Check if the FastAPI backend is running (cached for 10 seconds across reruns)."""
+    try:
+        response = get_client().head("/health", timeout=5)
+        return response.status_code == 200
+    except httpx.RequestError:
+        return False
+
+def stream_message(message: str, result: dict) -> Iterator[str]:
+    """
+    Yield reply text from the /chat/stream endpoint as it is generated.
+    
+    When the stream ends, `result` holds the same fields /chat returns
+    (available slots, booking status, ...). Replies the agent builds from
+    a template arrive in one piece with the final event.
+    """
+    payload = {
+        "message": message,
+        "session_id": st.session_state.session_id,
+        "include": RESPONSE_FIELDS
+    }
+    streamed = False
+    
+    try:
+        with get_client().stream(
+            "POST", "/chat/stream", content=_json_dumps(payload), headers=JSON_HEADERS, timeout=60
+        ) as response:
+            if response.status_code != 200:
+                response.read()
+                result.update(response=f"Error: {response.status_code} - {response.text}", error=True)
+                yield result["response"]
+                return
+            
+            event = None
+            for line in response.iter_lines():
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: "):
+                    data = _json_loads(line[len("data: "):])
+                    if event == "token":
+                        streamed = True
+                        yield data
+                    elif event == "done":
+                        result.update(data)
+                        if not streamed:
+                            yield data.get("response", "")
+                    elif event == "error":
+                        result.update(response=data.get("detail", "Error"), error=True)
+                        yield result["response"]
+    
+    except httpx.HTTPError as e:
+        result.update(response=f"Connection error: {str(e)}", error=True)
+        yield result["response"]
+
+# Static sidebar text, filled in with the live status on each run
+_SIDEBAR_MD = """\
+**API Status:** {status}
+
+**Session ID:** `{session_id}...`
+
+**Messages:** {count}
+
+---
+### 💡 How to Use
+1. **Start a conversation** by typing a greeting
+2. **Request a meeting** by saying something like:
+   - "I want to schedule a meeting"
+   - "Book a call for tomorrow"
+   - "Do you have time this Friday?"
+3. **Provide details** when asked:
+   - Date and time preferences
+   - Meeting duration
+   - Meeting purpose
+4. **Confirm** when shown available slots
+
+### 📝 Example Messages
+"""
+
+def sidebar_info():
+    """Display information in the sidebar."""
+    st.sidebar.title("📅 AI Booking Agent")
+    
+    # Status, instructions and the examples header go out as one element
+    api_status = check_api_status()
+    st.sidebar.markdown(_SIDEBAR_MD.format(
+        status="🟢 Connected" if api_status else "🔴 Disconnected",
+        session_id=st.session_state.session_id[:8],
+        count=len(st.session_state.messages)
+    ))
+    for key, example in EXAMPLE_MESSAGES:
+        if st.sidebar.button(f"💬 {example}", key=key):
+            st.session_state.example_message = example
+    
+    # Clear conversation
+    st.sidebar.markdown("---")
+    if st.sidebar.button("🗑️ Clear Conversation"):
+        st.session_state.messages = []
+        st.session_state.session_id = new_session_id()
+        st.session_state.pop("pending", None)  # app.py's in-flight reply
+        st.rerun()
+    
+    # Refresh API status
+    if st.sidebar.button("🔄 Refresh API Status"):
+        check_api_status.clear()
+        st.rerun()
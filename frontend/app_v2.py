@@ -2,73 +2,19 @@
 Alternative Streamlit frontend using built-in chat elements.
 """
 
+from __future__ import annotations
+
 import streamlit as st
-import requests
 from datetime import datetime
-from typing import Dict, Any, List
-import uuid
-
-# Configuration
-API_BASE_URL = "http://localhost:8000"
 
-# Page configuration
-st.set_page_config(
-    page_title="AI Calendar Booking Agent",
-    page_icon="📅",
-    layout="wide",
-    initial_sidebar_state="expanded"
+from _common import (
+    configure_page, initialize_session_state, check_api_status,
+    stream_message, sidebar_info, visible_history
 )
 
-def initialize_session_state():
-    """Initialize Streamlit session state variables."""
-    if "session_id" not in st.session_state:
-        st.session_state.session_id = str(uuid.uuid4())
-    
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
-    
-    if "api_status" not in st.session_state:
-        st.session_state.api_status = check_api_status()
-
-def check_api_status() -> bool:
-    """Check if the FastAPI backend is running."""
-    try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=5)
-        return response.status_code == 200
-    except requests.exceptions.RequestException:
-        return False
+configure_page()
 
-def send_message(message: str) -> Dict[str, Any]:
-    """Send message to the booking agent API."""
-    try:
-        payload = {
-            "message": message,
-            "session_id": st.session_state.session_id
-        }
-        
-        response = requests.post(
-            f"{API_BASE_URL}/chat",
-            json=payload,
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return {
-                "response": f"Error: {response.status_code} - {response.text}",
-                "session_id": st.session_state.session_id,
-                "error": True
-            }
-    
-    except requests.exceptions.RequestException as e:
-        return {
-            "response": f"Connection error: {str(e)}",
-            "session_id": st.session_state.session_id,
-            "error": True
-        }
-
-def display_availability_slots(slots: List[Dict]):
+def display_availability_slots(slots: list[dict]):
     """Display available time slots."""
     if not slots:
         return
@@ -82,60 +28,6 @@ def display_booking_confirmation():
     """Display booking confirmation."""
     st.success("✅ **Booking Confirmed!** Your appointment has been successfully scheduled.")
 
-def sidebar_info():
-    """Display information in the sidebar."""
-    st.sidebar.title("📅 AI Booking Agent")
-    
-    # API Status
-    status_color = "🟢" if st.session_state.api_status else "🔴"
-    status_text = "Connected" if st.session_state.api_status else "Disconnected"
-    st.sidebar.markdown(f"**API Status:** {status_color} {status_text}")
-    
-    # Session Info
-    st.sidebar.markdown(f"**Session ID:** `{st.session_state.session_id[:8]}...`")
-    st.sidebar.markdown(f"**Messages:** {len(st.session_state.messages)}")
-    
-    # Instructions
-    st.sidebar.markdown("---")
-    st.sidebar.markdown("### 💡 How to Use")
-    st.sidebar.markdown("""
-    1. **Start a conversation** by typing a greeting
-    2. **Request a meeting** by saying something like:
-       - "I want to schedule a meeting"
-       - "Book a call for tomorrow"
-       - "Do you have time this Friday?"
-    3. **Provide details** when asked:
-       - Date and time preferences
-       - Meeting duration
-       - Meeting purpose
-    4. **Confirm** when shown available slots
-    """)
-    
-    # Example messages
-    st.sidebar.markdown("### 📝 Example Messages")
-    example_messages = [
-        "Hi, I'd like to schedule a meeting",
-        "Do you have any free time tomorrow afternoon?",
-        "Book a 30-minute call for next Friday",
-        "I need to schedule a team meeting for next week"
-    ]
-    
-    for example in example_messages:
-        if st.sidebar.button(f"💬 {example}", key=f"example_{hash(example)}"):
-            st.session_state.example_message = example
-    
-    # Clear conversation
-    st.sidebar.markdown("---")
-    if st.sidebar.button("🗑️ Clear Conversation"):
-        st.session_state.messages = []
-        st.session_state.session_id = str(uuid.uuid4())
-        st.rerun()
-    
-    # Refresh API status
-    if st.sidebar.button("🔄 Refresh API Status"):
-        st.session_state.api_status = check_api_status()
-        st.rerun()
-
 def main():
     """Main Streamlit application."""
     initialize_session_state()
@@ -148,7 +40,7 @@ def main():
     st.markdown("Welcome! I'm your AI assistant for booking calendar appointments. How can I help you today?")
     
     # API Status Warning
-    if not st.session_state.api_status:
+    if not check_api_status():
         st.error("""
         ⚠️ **Backend API is not running!**
         
@@ -159,14 +51,16 @@ def main():
         """)
         st.stop()
     
-    # Display conversation history using Streamlit's chat elements
-    for message in st.session_state.messages:
+    # Display conversation history using Streamlit's chat elements.
+    # Contents are always strings, so go straight to st.markdown instead of
+    # st.write's type dispatch; the Markdown itself is rendered by the browser.
+    for message in visible_history():
         if message["role"] == "user":
             with st.chat_message("user"):
-                st.write(message["content"])
+                st.markdown(message["content"])
         else:
             with st.chat_message("assistant"):
-                st.write(message["content"])
+                st.markdown(message["content"])
                 
                 # Display additional information if available
                 if "available_slots" in message and message["available_slots"]:
@@ -194,16 +88,24 @@ def main():
         
         # Display user message
         with st.chat_message("user"):
-            st.write(user_input)
+            st.markdown(user_input)
         
-        # Send to API and get response
-        with st.spinner("🤔 Thinking..."):
-            response_data = send_message(user_input)
+        # Stream the reply into the assistant bubble as it is generated
+        response_data: dict = {}
+        with st.chat_message("assistant"):
+            streamed_text = st.write_stream(stream_message(user_input, response_data))
+            
+            # Display additional information if available
+            if response_data.get("available_slots"):
+                display_availability_slots(response_data["available_slots"])
+            
+            if response_data.get("booking_confirmed"):
+                display_booking_confirmation()
         
         # Add assistant response to history
         assistant_message = {
             "role": "assistant",
-            "content": response_data.get("response", "Sorry, I couldn't process that."),
+            "content": response_data.get("response") or streamed_text or "Sorry, I couldn't process that.",
             "timestamp": datetime.now().isoformat(),
             "available_slots": response_data.get("available_slots"),
             "booking_confirmed": response_data.get("booking_confirmed", False),
@@ -211,17 +113,6 @@ def main():
             "extracted_info": response_data.get("extracted_info")
         }
         st.session_state.messages.append(assistant_message)
-        
-        # Display assistant response
-        with st.chat_message("assistant"):
-            st.write(response_data.get("response", "Sorry, I couldn't process that."))
-            
-            # Display additional information if available
-            if response_data.get("available_slots"):
-                display_availability_slots(response_data["available_slots"])
-            
-            if response_data.get("booking_confirmed"):
-                display_booking_confirmation()
     
     # Footer
     st.markdown("---")
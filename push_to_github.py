@@ -2,10 +2,33 @@
 Script to help push to GitHub with proper authentication.
 """
 
+import configparser
 import subprocess
 import sys
 import os
 
+GIT_DIR = '.git'
+
+def read_remotes():
+    """Remote name/URL lines like `git remote -v`, read from .git/config."""
+    config = configparser.ConfigParser(strict=False, interpolation=None)
+    config.read(os.path.join(GIT_DIR, 'config'))
+    lines = []
+    for section in config.sections():
+        if section.startswith('remote "') and config.has_option(section, 'url'):
+            name = section[len('remote "'):-1]
+            url = config.get(section, 'url')
+            lines.append(f"{name}\t{url} (fetch)")
+            lines.append(f"{name}\t{config.get(section, 'pushurl', fallback=url)} (push)")
+    return "\n".join(lines) + "\n"
+
+def read_branch():
+    """Current branch name from .git/HEAD (commit hash if detached)."""
+    with open(os.path.join(GIT_DIR, 'HEAD')) as f:
+        head = f.read().strip()
+    prefix = 'ref: refs/heads/'
+    return (head[len(prefix):] if head.startswith(prefix) else head) + "\n"
+
 def push_to_github():
     """Push code to GitHub with authentication guidance."""
     
@@ -46,21 +69,31 @@ def push_to_github():
     print("\n" + "=" * 50)
     print("📋 CURRENT STATUS:")
     
+    # Read remotes and branch straight from .git; worktrees and submodules
+    # have a .git file instead of a directory, so ask git there
+    in_git_dir = os.path.isdir(GIT_DIR)
+
     # Check current remote
     try:
-        result = subprocess.run(['git', 'remote', '-v'], 
-                              capture_output=True, text=True, cwd='.')
+        if in_git_dir:
+            remotes = read_remotes()
+        else:
+            remotes = subprocess.run(['git', 'remote', '-v'],
+                                     capture_output=True, text=True, cwd='.').stdout
         print("Current remote URLs:")
-        print(result.stdout)
+        print(remotes)
     except Exception as e:
         print(f"Error checking remotes: {e}")
     
     # Check current branch
     try:
-        result = subprocess.run(['git', 'branch'], 
-                              capture_output=True, text=True, cwd='.')
+        if in_git_dir:
+            branch = read_branch()
+        else:
+            branch = subprocess.run(['git', 'branch', '--show-current'],
+                                    capture_output=True, text=True, cwd='.').stdout
         print("Current branch:")
-        print(result.stdout)
+        print(branch)
     except Exception as e:
         print(f"Error checking branch: {e}")
     
@@ -1,60 +1,97 @@
 """
 Quick test to verify the booking agent is working.
+
+Pass --sessions N to run N independent booking conversations at once.
 """
 
-import requests
+import sys
 import json
-import time
+import asyncio
+import uuid
+
+import httpx
+
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+JSON_HEADERS = {"Content-Type": "application/json"}
 
 API_BASE_URL = "http://localhost:8000"
 
-def test_conversation():
-    """Test a complete booking conversation."""
-    print("🧪 Testing AI Calendar Booking Agent")
-    print("=" * 50)
-    
-    session_id = "test_session_123"
-    
-    # Test conversation flow
-    conversation = [
-        "Hello, I'd like to schedule a meeting",
-        "Tomorrow afternoon would be great",
-        "The first option looks good",
-        "Yes, please confirm the booking"
-    ]
-    
-    for i, message in enumerate(conversation, 1):
-        print(f"\n👤 Step {i}: {message}")
-        
+# Test conversation flow; the turns of one session must stay in order
+CONVERSATION = [
+    "Hello, I'd like to schedule a meeting",
+    "Tomorrow afternoon would be great",
+    "The first option looks good",
+    "Yes, please confirm the booking"
+]
+
+async def warm_up(client: httpx.AsyncClient):
+    """Probe /health and /docs together before the conversation starts."""
+    health, docs = await asyncio.gather(
+        client.get("/health"), client.get("/docs"), return_exceptions=True
+    )
+    for name, result in (("health", health), ("docs", docs)):
+        if isinstance(result, Exception):
+            print(f"❌ /{name} failed: {result}")
+        elif result.status_code != 200:
+            print(f"❌ /{name} returned {result.status_code}")
+
+async def run_session(client: httpx.AsyncClient, session_id: str, label: str = ""):
+    """Send the booking conversation turn by turn for one session."""
+    for i, message in enumerate(CONVERSATION, 1):
+        print(f"\n{label}👤 Step {i}: {message}")
+
         try:
-            response = requests.post(
-                f"{API_BASE_URL}/chat",
-                json={"message": message, "session_id": session_id},
-                timeout=10
+            response = await client.post(
+                "/chat",
+                content=_json_dumps({"message": message, "session_id": session_id}),
+                headers=JSON_HEADERS
             )
-            
+
             if response.status_code == 200:
-                data = response.json()
-                print(f"🤖 Agent: {data['response']}")
-                
+                data = _json_loads(response.content)
+                print(f"{label}🤖 Agent: {data['response']}")
+
                 if data.get('available_slots'):
-                    print(f"📅 Found {len(data['available_slots'])} available slots")
-                
+                    print(f"{label}📅 Found {len(data['available_slots'])} available slots")
+
                 if data.get('booking_confirmed'):
-                    print("✅ Booking confirmed!")
-                    
+                    print(f"{label}✅ Booking confirmed!")
+
             else:
-                print(f"❌ Error: {response.status_code}")
-                
-        except Exception as e:
-            print(f"❌ Request failed: {e}")
-        
-        time.sleep(1)
-    
+                print(f"{label}❌ Error: {response.status_code}")
+
+        except httpx.HTTPError as e:
+            print(f"{label}❌ Request failed: {e}")
+
+async def test_conversation(sessions: int = 1):
+    """Test a complete booking conversation, optionally over several sessions at once."""
+    print("🧪 Testing AI Calendar Booking Agent")
+    print("=" * 50)
+
+    async with httpx.AsyncClient(base_url=API_BASE_URL, timeout=10) as client:
+        await warm_up(client)
+
+        if sessions == 1:
+            await run_session(client, "test_session_123")
+        else:
+            run_id = uuid.uuid4().hex[:8]
+            await asyncio.gather(*(
+                run_session(client, f"test_{run_id}_{n}", label=f"[{n}] ")
+                for n in range(sessions)
+            ))
+
     print("\n" + "=" * 50)
     print("✅ Test completed!")
     print("🌐 Frontend available at: http://localhost:8501")
     print("📚 API docs at: http://localhost:8000/docs")
 
 if __name__ == "__main__":
-    test_conversation()
+    sessions = int(sys.argv[sys.argv.index("--sessions") + 1]) if "--sessions" in sys.argv else 1
+    asyncio.run(test_conversation(sessions))
@@ -2,16 +2,14 @@
 Script to run the colored Streamlit frontend.
 """
 
-import os
 import sys
 import subprocess
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Loads .env and parses the environment once
+from backend.config import settings
 
 if __name__ == "__main__":
-    port = int(os.getenv("STREAMLIT_PORT", 8501))
+    port = settings.STREAMLIT_PORT
     
     print(f"🎨 Starting Streamlit frontend (colored version) on http://localhost:{port}")
     
@@ -6,13 +6,51 @@ Starts both backend and frontend services.
 import os
 import sys
 import time
+import socket
 import subprocess
 import threading
 import signal
-from dotenv import load_dotenv
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# Load environment variables
-load_dotenv()
+# Loads .env and parses the environment once
+from backend.config import settings
+
+# How long each service gets to start accepting connections
+READY_TIMEOUT_SECONDS = 30
+
+
+# Lines of child stderr kept for the failure report
+STDERR_TAIL_LINES = 200
+
+
+def _drain_stderr(process, tail):
+    """Echo a child's stderr as it arrives, keeping the last lines in `tail`."""
+    for line in process.stderr:
+        sys.stderr.write(line)
+        tail.append(line)
+
+
+def spawn_python(script):
+    """
+    Start `script` with this interpreter.
+    
+    stdout goes straight to our terminal. stderr is read continuously by a
+    background thread, so a chatty child can never block on a full pipe; its
+    last lines are kept on `process.stderr_tail` for the failure report.
+    On POSIX, close_fds=False lets subprocess use posix_spawn (or vfork)
+    instead of fork+exec; our own descriptors are non-inheritable anyway.
+    """
+    options = {"stdout": None, "stderr": subprocess.PIPE, "text": True, "bufsize": 1}
+    if os.name != "nt":
+        options["close_fds"] = False
+    process = subprocess.Popen([sys.executable, script], **options)
+    process.stderr_tail = deque(maxlen=STDERR_TAIL_LINES)
+    process.stderr_reader = threading.Thread(
+        target=_drain_stderr, args=(process, process.stderr_tail), daemon=True
+    )
+    process.stderr_reader.start()
+    return process
 
 class AppLauncher:
     """Application launcher for both backend and frontend."""
@@ -26,9 +64,9 @@ class AppLauncher:
         """Check if all requirements are met."""
         print("🔍 Checking requirements...")
         
-        # Check Python version
-        if sys.version_info < (3, 8):
-            print("❌ Python 3.8 or higher is required")
+        # Check Python version (zoneinfo needs 3.9)
+        if sys.version_info < (3, 9):
+            print("❌ Python 3.9 or higher is required")
             return False
         
         # Check if .env file exists
@@ -43,7 +81,7 @@ class AppLauncher:
                 return False
         
         # Check OpenAI API key
-        openai_key = os.getenv('OPENAI_API_KEY')
+        openai_key = settings.OPENAI_API_KEY
         if not openai_key or openai_key == 'your_openai_api_key_here':
             print("❌ OpenAI API key not set in .env file")
             print("   Please add your OpenAI API key to the .env file")
@@ -59,67 +97,72 @@ class AppLauncher:
         return True
     
     def start_backend(self):
-        """Start the FastAPI backend."""
+        """Launch the FastAPI backend; readiness is checked by wait_until_ready."""
         print("🚀 Starting backend server...")
-        try:
-            self.backend_process = subprocess.Popen([
-                sys.executable, "run_backend.py"
-            ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-            
-            # Wait a moment for the server to start
-            time.sleep(3)
-            
-            if self.backend_process.poll() is None:
-                print("✅ Backend server started successfully")
-                return True
-            else:
-                print("❌ Backend server failed to start")
-                stdout, stderr = self.backend_process.communicate()
-                print(f"Error: {stderr}")
-                return False
-        
-        except Exception as e:
-            print(f"❌ Failed to start backend: {e}")
-            return False
+        self.backend_process = spawn_python("run_backend.py")
     
     def start_frontend(self):
-        """Start the Streamlit frontend."""
+        """Launch the Streamlit frontend; readiness is checked by wait_until_ready."""
         print("🎨 Starting frontend interface...")
-        try:
-            self.frontend_process = subprocess.Popen([
-                sys.executable, "run_frontend.py"
-            ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-            
-            # Wait a moment for the server to start
-            time.sleep(3)
-            
-            if self.frontend_process.poll() is None:
-                print("✅ Frontend interface started successfully")
-                return True
-            else:
-                print("❌ Frontend interface failed to start")
-                stdout, stderr = self.frontend_process.communicate()
-                print(f"Error: {stderr}")
+        self.frontend_process = spawn_python("run_frontend.py")
+    
+    def wait_until_ready(self, name, process, port, timeout=READY_TIMEOUT_SECONDS):
+        """Wait until `process` accepts connections on `port`; False if it exits or times out."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                print(f"❌ {name} failed to start")
+                process.stderr_reader.join(timeout=1)
+                print(f"Error: {''.join(process.stderr_tail)}")
                 return False
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=0.1):
+                    print(f"✅ {name} started successfully")
+                    return True
+            except OSError:
+                time.sleep(0.05)
         
-        except Exception as e:
-            print(f"❌ Failed to start frontend: {e}")
-            return False
+        print(f"❌ {name} did not start listening on port {port} within {timeout}s")
+        return False
     
     def monitor_processes(self):
-        """Monitor running processes."""
-        while self.running:
-            time.sleep(5)
-            
-            # Check backend
-            if self.backend_process and self.backend_process.poll() is not None:
-                print("⚠️  Backend process stopped unexpectedly")
-                break
-            
-            # Check frontend
-            if self.frontend_process and self.frontend_process.poll() is not None:
-                print("⚠️  Frontend process stopped unexpectedly")
-                break
+        """Block until either service exits, then report which one stopped."""
+        services = {
+            self.backend_process.pid: ("Backend", self.backend_process),
+            self.frontend_process.pid: ("Frontend", self.frontend_process)
+        }
+        
+        if hasattr(os, "waitid"):
+            # Sleep in the kernel until a child exits; WNOWAIT leaves it for Popen to reap
+            while self.running:
+                try:
+                    pid = os.waitid(os.P_ALL, 0, os.WEXITED | os.WNOWAIT).si_pid
+                except ChildProcessError:
+                    return
+                if pid in services:
+                    name, process = services[pid]
+                    process.wait()
+                    break
+                # Not one of ours; reap it so waitid doesn't report it again
+                os.waitpid(pid, 0)
+        else:
+            # No waitid (Windows): one waiter thread per child
+            exited = threading.Event()
+            stopped = []
+            for name, process in services.values():
+                def wait(name=name, process=process):
+                    process.wait()
+                    stopped.append(name)
+                    exited.set()
+                threading.Thread(target=wait, daemon=True).start()
+            # Short waits keep Ctrl+C responsive on Windows
+            while self.running and not exited.wait(1):
+                pass
+            if not stopped:
+                return
+            name = stopped[0]
+        
+        print(f"⚠️  {name} process stopped unexpectedly")
     
     def stop_services(self):
         """Stop all services."""
@@ -165,15 +208,34 @@ class AppLauncher:
             return
         
         try:
-            # Start backend
-            if not self.start_backend():
-                print("❌ Failed to start backend. Exiting.")
+            # Launch both services at once and wait for them in parallel
+            try:
+                self.start_backend()
+                self.start_frontend()
+            except Exception as e:
+                print(f"❌ Failed to launch services: {e}")
                 return
             
-            # Start frontend
-            if not self.start_frontend():
-                print("❌ Failed to start frontend. Stopping backend.")
-                self.stop_services()
+            checks = {
+                "Backend server": (self.backend_process, settings.FASTAPI_PORT),
+                "Frontend interface": (self.frontend_process, settings.STREAMLIT_PORT)
+            }
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                futures = [
+                    executor.submit(self.wait_until_ready, name, process, port)
+                    for name, (process, port) in checks.items()
+                ]
+                ready = True
+                for future in as_completed(futures):
+                    if ready and not future.result():
+                        # Don't wait out the other service's timeout
+                        ready = False
+                        for process, _ in checks.values():
+                            if process.poll() is None:
+                                process.terminate()
+            
+            if not ready:
+                print("❌ Failed to start the application. Exiting.")
                 return
             
             # Show success message
@@ -181,9 +243,9 @@ class AppLauncher:
             print("🎉 APPLICATION STARTED SUCCESSFULLY!")
             print("=" * 50)
             print("🌐 Access the application at:")
-            print(f"   Frontend UI: http://localhost:{os.getenv('STREAMLIT_PORT', 8501)}")
-            print(f"   Backend API: http://localhost:{os.getenv('FASTAPI_PORT', 8000)}")
-            print(f"   API Docs: http://localhost:{os.getenv('FASTAPI_PORT', 8000)}/docs")
+            print(f"   Frontend UI: http://localhost:{settings.STREAMLIT_PORT}")
+            print(f"   Backend API: http://localhost:{settings.FASTAPI_PORT}")
+            print(f"   API Docs: http://localhost:{settings.FASTAPI_PORT}/docs")
             print("\n💡 Usage:")
             print("   1. Open the frontend URL in your browser")
             print("   2. Start chatting with the AI agent")
@@ -191,14 +253,8 @@ class AppLauncher:
             print("\n⏹️  Press Ctrl+C to stop the application")
             print("=" * 50)
             
-            # Monitor processes
-            monitor_thread = threading.Thread(target=self.monitor_processes)
-            monitor_thread.daemon = True
-            monitor_thread.start()
-            
-            # Keep the main thread alive
-            while self.running:
-                time.sleep(1)
+            # Wait for a service to exit; Ctrl+C and SIGTERM go to signal_handler
+            self.monitor_processes()
         
         except KeyboardInterrupt:
             print("\n⏹️  Application interrupted by user")
@@ -3,27 +3,21 @@ Main Streamlit app for deployment to Streamlit Cloud.
 This is a standalone version that works without the FastAPI backend.
 """
 
+import re
+import html
 import streamlit as st
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, Any, List
-import uuid
+from zoneinfo import ZoneInfo
+from typing import Dict, Any, List, Sequence
 import random
 
-# Try to import pytz, fallback if not available
-try:
-    import pytz
-except ImportError:
-    # Create a simple timezone class for fallback
-    class SimpleTimezone:
-        def __init__(self, name):
-            self.name = name
-        def localize(self, dt):
-            return dt
-    pytz = type('pytz', (), {'timezone': lambda name: SimpleTimezone(name)})()
-
 # Force standalone mode - no external API calls
 STANDALONE_MODE = True
 
+# Conversations kept by each MockBackend; older ones are dropped first
+MAX_MOCK_SESSIONS = 1024
+
 # Page configuration
 st.set_page_config(
     page_title="AI Calendar Booking Agent",
@@ -32,16 +26,98 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+def _keyword_re(*words: str) -> "re.Pattern":
+    """One alternation that matches any of `words` anywhere in the text (like `word in text`)."""
+    return re.compile('|'.join(re.escape(word) for word in words))
+
+
+# Intent keywords, compiled once; each check is a single scan of the message
+_GREETING_RE = _keyword_re('hello', 'hi', 'hey', 'good morning', 'good afternoon', 'greetings')
+_BOOKING_RE = _keyword_re('schedule', 'book', 'meeting', 'appointment', 'call', 'time', 'available',
+                          'free', 'slot', 'want', 'need', 'like')
+_CONFIRM_RE = _keyword_re('yes', 'confirm', 'ok', 'sure', 'sounds good', 'perfect', 'please')
+_CONFIRM_CONTEXT_RE = _keyword_re('book', 'confirm', 'yes')
+_SELECT_RE = _keyword_re('first', 'second', 'third', 'option', '1', '2', '3', 'looks good', 'good', 'that one')
+_DATE_WORD_RE = _keyword_re('tomorrow', 'today', 'friday', 'monday', 'tuesday', 'wednesday', 'thursday',
+                            'saturday', 'sunday', 'next week', 'afternoon', 'morning', 'evening')
+# Dates _extract_info can resolve, in order of precedence
+_DATE_WORDS = ('tomorrow', 'friday', 'next week')
+_DATE_RE = _keyword_re(*_DATE_WORDS)
+
+def _classify_intent(message: str) -> str:
+    """Intent for a lowercased message, from the keyword patterns above."""
+    # More flexible intent detection
+    if _GREETING_RE.search(message) and len(message.split()) <= 5:
+        return 'greeting'
+    elif _CONFIRM_RE.search(message) and _CONFIRM_CONTEXT_RE.search(message):
+        return 'confirm_booking'
+    elif _SELECT_RE.search(message):
+        return 'select_slot'
+    elif _BOOKING_RE.search(message):
+        return 'book_meeting'
+    elif _DATE_WORD_RE.search(message):
+        return 'book_meeting'  # Treat date mentions as booking intent
+    else:
+        return 'general'
+
+
+# Common one-word replies, classified once by the same rules (so "third" is still
+# a greeting, since it contains "hi", and a bare "ok" is still general)
+_ONE_WORD_INTENTS = {
+    word: _classify_intent(word)
+    for word in ('hi', 'hello', 'hey', 'yes', 'ok', 'sure', 'confirm', 'please', 'perfect',
+                 '1', '2', '3', 'first', 'second', 'third', 'book', 'schedule',
+                 'tomorrow', 'today', 'friday')
+}
+
+# Mock slot start times with their 1-hour end labels; only the date varies per request
+_SLOT_TIMES = tuple(
+    (start.time(), start.strftime('%I:%M %p'), (start + timedelta(hours=1)).strftime('%I:%M %p'))
+    for start in (datetime.strptime(t, '%I:%M %p') for t in ('09:00 AM', '11:00 AM', '02:00 PM'))
+)
+
+# Reply templates; the numbered slot list only depends on _SLOT_TIMES, so it is built once
+_SLOT_LINES = "\n".join(
+    f"{i}. {start_label} - {end_label}" for i, (_, start_label, end_label) in enumerate(_SLOT_TIMES, 1)
+)
+_SLOTS_FOUND_MSG = (
+    "Perfect! I found some available time slots for {date}:\n\n" + _SLOT_LINES + "\n\n"
+    "Which time works best for you? Just let me know the number (1, 2, or 3) or say something like "
+    "'the first option looks good'."
+)
+_SLOTS_AGAIN_MSG = (
+    "I'm not sure which slot you'd like. Here are your options again:\n\n" + _SLOT_LINES + "\n\n"
+    "Please tell me which number you prefer (1, 2, or 3)."
+)
+_BOOKING_CONFIRMED_MSG = """✅ **Booking Confirmed!**
+
+Your meeting has been successfully scheduled:
+📅 **Date:** {date}
+🕐 **Time:** {start_time} - {end_time}
+📝 **Event ID:** {event_id}
+
+This is a demo booking using mock calendar data. In the full version with backend deployment, this would create a real calendar event.
+
+Is there anything else I can help you with?"""
+
 # Mock Backend for Streamlit Cloud
 class MockBackend:
     """Mock backend that simulates the FastAPI responses for Streamlit Cloud."""
     
     def __init__(self):
-        self.sessions = {}
-        self.timezone = pytz.timezone('America/New_York')
+        # session_id -> session, least recently used first
+        self.sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.max_sessions = MAX_MOCK_SESSIONS
+        self.timezone = ZoneInfo('America/New_York')
+        # (today, {date word: resolved date}), recomputed when the day changes
+        self._date_cache = (None, {})
     
     def process_chat(self, message: str, session_id: str) -> Dict[str, Any]:
         """Process chat message and return mock response."""
+        return self.process_chat_batch([message], session_id)[0]
+    
+    def process_chat_batch(self, messages: Sequence[str], session_id: str) -> List[Dict[str, Any]]:
+        """Process several turns of one session in order, looking the session up once."""
         
         # Initialize session
         if session_id not in self.sessions:
@@ -53,6 +129,16 @@ class MockBackend:
             }
         
         session = self.sessions[session_id]
+        self.sessions.move_to_end(session_id)
+        if len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+        
+        # Resolve date words once for the whole batch
+        self._resolved_dates()
+        return [self._respond(message, session_id, session) for message in messages]
+    
+    def _respond(self, message: str, session_id: str, session: Dict[str, Any]) -> Dict[str, Any]:
+        """Advance the session by one user turn."""
         message_lower = message.lower().strip()
         
         # Simple intent analysis
@@ -102,52 +188,28 @@ class MockBackend:
             "response": response,
             "session_id": session_id,
             "intent": intent,
-            "extracted_info": session['extracted_info'],
+            # Copied so earlier responses in a batch keep the info as of their turn
+            "extracted_info": dict(session['extracted_info']),
             "available_slots": session.get('available_slots', []),
             "booking_confirmed": session.get('booking_confirmed', False)
         }
     
     def _analyze_intent(self, message: str) -> str:
         """Analyze user intent."""
-        greeting_words = ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'greetings']
-        booking_words = ['schedule', 'book', 'meeting', 'appointment', 'call', 'time', 'available', 'free', 'slot']
-        confirmation_words = ['yes', 'confirm', 'ok', 'sure', 'sounds good', 'perfect', 'please']
-        selection_words = ['first', 'second', 'third', 'option', '1', '2', '3', 'looks good', 'good', 'that one']
-        date_words = ['tomorrow', 'today', 'friday', 'monday', 'tuesday', 'wednesday', 'thursday', 'saturday', 'sunday', 'next week', 'afternoon', 'morning', 'evening']
-
-        # More flexible intent detection
-        if any(word in message for word in greeting_words) and len(message.split()) <= 5:
-            return 'greeting'
-        elif any(word in message for word in confirmation_words) and ('book' in message or 'confirm' in message or 'yes' in message):
-            return 'confirm_booking'
-        elif any(word in message for word in selection_words):
-            return 'select_slot'
-        elif any(word in message for word in booking_words) or 'want' in message or 'need' in message or 'like' in message:
-            return 'book_meeting'
-        elif any(word in message for word in date_words):
-            return 'book_meeting'  # Treat date mentions as booking intent
-        else:
-            return 'general'
+        # One-word replies ("hi", "yes", "2") are answered from the precomputed table
+        intent = _ONE_WORD_INTENTS.get(message)
+        return intent if intent is not None else _classify_intent(message)
     
     def _extract_info(self, message: str) -> Dict[str, Any]:
         """Extract booking information."""
         info = {}
         message_lower = message.lower()
         
-        # Extract dates
-        if 'tomorrow' in message_lower:
-            tomorrow = datetime.now(self.timezone) + timedelta(days=1)
-            info['date'] = tomorrow.strftime('%Y-%m-%d')
-        elif 'friday' in message_lower:
-            today = datetime.now(self.timezone)
-            days_ahead = 4 - today.weekday()
-            if days_ahead <= 0:
-                days_ahead += 7
-            friday = today + timedelta(days=days_ahead)
-            info['date'] = friday.strftime('%Y-%m-%d')
-        elif 'next week' in message_lower:
-            next_week = datetime.now(self.timezone) + timedelta(days=7)
-            info['date'] = next_week.strftime('%Y-%m-%d')
+        # Extract dates; the first word in precedence order wins
+        dates = set(_DATE_RE.findall(message_lower))
+        if dates:
+            resolved = self._resolved_dates()
+            info['date'] = next(resolved[word] for word in _DATE_WORDS if word in dates)
         
         # Extract duration
         if '30' in message and 'minute' in message_lower:
@@ -157,6 +219,20 @@ class MockBackend:
         
         return info
     
+    def _resolved_dates(self) -> Dict[str, str]:
+        """Dates for the words _extract_info understands, computed once per day."""
+        today = datetime.now(self.timezone).date()
+        if self._date_cache[0] != today:
+            days_to_friday = 4 - today.weekday()
+            if days_to_friday <= 0:
+                days_to_friday += 7
+            self._date_cache = (today, {
+                'tomorrow': (today + timedelta(days=1)).isoformat(),
+                'friday': (today + timedelta(days=days_to_friday)).isoformat(),
+                'next week': (today + timedelta(days=7)).isoformat()
+            })
+        return self._date_cache[1]
+    
     def _handle_booking_request(self, session: Dict) -> str:
         """Handle booking requests."""
         extracted = session['extracted_info']
@@ -180,12 +256,7 @@ class MockBackend:
         except:
             formatted_date = date_str
 
-        response = f"Perfect! I found some available time slots for {formatted_date}:\n\n"
-        for i, slot in enumerate(available_slots[:3], 1):
-            response += f"{i}. {slot['start_time']} - {slot['end_time']}\n"
-
-        response += "\nWhich time works best for you? Just let me know the number (1, 2, or 3) or say something like 'the first option looks good'."
-        return response
+        return _SLOTS_FOUND_MSG.format(date=formatted_date)
     
     def _generate_mock_slots(self, date_str: str) -> List[Dict]:
         """Generate mock available slots."""
@@ -194,19 +265,16 @@ class MockBackend:
         except:
             date_obj = datetime.now(self.timezone) + timedelta(days=1)
         
+        date = date_obj.strftime('%Y-%m-%d')
         slots = []
-        times = ['09:00 AM', '11:00 AM', '02:00 PM', '03:30 PM', '04:00 PM']
-        
-        for i, time in enumerate(times[:3]):
-            start_time = datetime.strptime(f"{date_obj.strftime('%Y-%m-%d')} {time}", '%Y-%m-%d %I:%M %p')
-            end_time = start_time + timedelta(hours=1)
-            
+        for start_clock, start_label, end_label in _SLOT_TIMES:
+            start_time = datetime.combine(date_obj.date(), start_clock)
             slots.append({
-                'date': date_obj.strftime('%Y-%m-%d'),
-                'start_time': start_time.strftime('%I:%M %p'),
-                'end_time': end_time.strftime('%I:%M %p'),
+                'date': date,
+                'start_time': start_label,
+                'end_time': end_label,
                 'start': start_time,
-                'end': end_time
+                'end': start_time + timedelta(hours=1)
             })
         
         return slots
@@ -237,11 +305,7 @@ class MockBackend:
             return f"Perfect! I'll book the slot on {slot['date']} from {slot['start_time']} to {slot['end_time']}. Should I confirm this booking?"
         else:
             # Show the options again
-            response = "I'm not sure which slot you'd like. Here are your options again:\n\n"
-            for i, slot in enumerate(available_slots[:3], 1):
-                response += f"{i}. {slot['start_time']} - {slot['end_time']}\n"
-            response += "\nPlease tell me which number you prefer (1, 2, or 3)."
-            return response
+            return _SLOTS_AGAIN_MSG
     
     def _handle_confirmation(self, session: Dict, message: str) -> str:
         """Handle booking confirmation."""
@@ -251,16 +315,12 @@ class MockBackend:
                 session['booking_confirmed'] = True
                 event_id = f"mock_{random.randint(1000, 9999)}"
                 
-                return f"""✅ **Booking Confirmed!**
-
-Your meeting has been successfully scheduled:
-📅 **Date:** {selected_slot['date']}
-🕐 **Time:** {selected_slot['start_time']} - {selected_slot['end_time']}
-📝 **Event ID:** {event_id}
-
-This is a demo booking using mock calendar data. In the full version with backend deployment, this would create a real calendar event.
-
-Is there anything else I can help you with?"""
+                return _BOOKING_CONFIRMED_MSG.format(
+                    date=selected_slot['date'],
+                    start_time=selected_slot['start_time'],
+                    end_time=selected_slot['end_time'],
+                    event_id=event_id
+                )
             else:
                 return "I don't see a selected time slot to confirm. Please choose a time slot first."
         else:
@@ -270,104 +330,98 @@ Is there anything else I can help you with?"""
 if 'mock_backend' not in st.session_state:
     st.session_state.mock_backend = MockBackend()
 
+def new_session_id() -> str:
+    """Random 64-bit hex id; the mock sessions only need uniqueness, not secrecy."""
+    return f"{random.getrandbits(64):016x}"
+
 def initialize_session_state():
     """Initialize Streamlit session state variables."""
     if "session_id" not in st.session_state:
-        st.session_state.session_id = str(uuid.uuid4())
+        st.session_state.session_id = new_session_id()
     
     if "messages" not in st.session_state:
         st.session_state.messages = []
 
-def display_user_message(content: str):
-    """Display user message with blue styling."""
-    col1, col2, col3 = st.columns([1, 3, 1])
-    with col2:
-        st.markdown(f"""
-        <div style="
-            background-color: #e3f2fd;
-            padding: 1rem;
-            border-radius: 10px;
-            margin: 0.5rem 0;
-            border-left: 4px solid #2196f3;
-            text-align: left;
-        ">
-            <div style="color: #1976d2; font-weight: bold; margin-bottom: 0.5rem;">👤 You</div>
-            <div style="color: #1565c0; line-height: 1.5;">{content}</div>
-        </div>
-        """, unsafe_allow_html=True)
-
-def display_assistant_message(content: str):
-    """Display assistant message with gray styling."""
-    col1, col2, col3 = st.columns([1, 3, 1])
-    with col2:
-        st.markdown(f"""
-        <div style="
-            background-color: #f5f5f5;
-            padding: 1rem;
-            border-radius: 10px;
-            margin: 0.5rem 0;
-            border-left: 4px solid #666;
-            text-align: left;
-        ">
-            <div style="color: #666; font-weight: bold; margin-bottom: 0.5rem;">🤖 AI Assistant</div>
-            <div style="color: #333; line-height: 1.5; white-space: pre-wrap;">{content}</div>
-        </div>
-        """, unsafe_allow_html=True)
-
-def display_availability_slots(slots: List[Dict]):
-    """Display available time slots."""
-    if not slots:
-        return
-    
-    col1, col2, col3 = st.columns([1, 3, 1])
-    with col2:
-        st.markdown("""
-        <div style="
-            background-color: #e8f5e8;
-            padding: 1rem;
-            border-radius: 10px;
-            margin: 0.5rem 0;
-            border-left: 4px solid #4caf50;
-        ">
-            <div style="color: #2e7d32; font-weight: bold; margin-bottom: 0.5rem;">📅 Available Time Slots</div>
-        """, unsafe_allow_html=True)
-        
-        for i, slot in enumerate(slots[:5], 1):
-            st.markdown(f"""
-            <div style="
-                background-color: #ffffff;
-                padding: 0.5rem;
-                border-radius: 5px;
-                margin: 0.3rem 0;
-                border: 1px solid #c8e6c9;
-            ">
-                <span style="color: #2e7d32; font-weight: bold;">Option {i}:</span>
-                <span style="color: #333;"> {slot.get('date', 'N/A')} from {slot.get('start_time', 'N/A')} to {slot.get('end_time', 'N/A')}</span>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        st.markdown("</div>", unsafe_allow_html=True)
+# Card styles, sent once per run instead of inline on every card
+_CSS = """
+<style>
+.msg { padding: 1rem; border-radius: 10px; margin: 0.5rem 0; text-align: left; }
+.msg-author { font-weight: bold; margin-bottom: 0.5rem; }
+.msg-text { line-height: 1.5; white-space: pre-wrap; }
+.user-msg { background-color: #e3f2fd; border-left: 4px solid #2196f3; }
+.user-msg .msg-author { color: #1976d2; }
+.user-msg .msg-text { color: #1565c0; }
+.assistant-msg { background-color: #f5f5f5; border-left: 4px solid #666; }
+.assistant-msg .msg-author { color: #666; }
+.assistant-msg .msg-text { color: #333; }
+.slots-card { background-color: #e8f5e8; padding: 1rem; border-radius: 10px; margin: 0.5rem 0; border-left: 4px solid #4caf50; }
+.slots-title { color: #2e7d32; font-weight: bold; margin-bottom: 0.5rem; }
+.slot-row { background-color: #ffffff; padding: 0.5rem; border-radius: 5px; margin: 0.3rem 0; border: 1px solid #c8e6c9; }
+.slot-label { color: #2e7d32; font-weight: bold; }
+.slot-time { color: #333; }
+.booking-card { background-color: #e8f5e8; padding: 1rem; border-radius: 10px; margin: 0.5rem 0; border: 2px solid #4caf50; text-align: center; }
+.booking-title { color: #2e7d32; font-size: 1.2rem; font-weight: bold; }
+.booking-text { color: #333; margin-top: 0.5rem; }
+</style>
+"""
 
-def display_booking_confirmation():
-    """Display booking confirmation."""
-    col1, col2, col3 = st.columns([1, 3, 1])
-    with col2:
-        st.markdown("""
-        <div style="
-            background-color: #e8f5e8;
-            padding: 1rem;
-            border-radius: 10px;
-            margin: 0.5rem 0;
-            border: 2px solid #4caf50;
-            text-align: center;
-        ">
-            <div style="color: #2e7d32; font-size: 1.2rem; font-weight: bold;">✅ Booking Confirmed!</div>
-            <div style="color: #333; margin-top: 0.5rem;">Your appointment has been successfully scheduled.</div>
-        </div>
-        """, unsafe_allow_html=True)
+# Message-card HTML, built once. Values are escaped and newlines become &#10;
+# so every card stays on one line and the joined history is a single HTML block.
+_USER_TPL = (
+    '<div class="msg user-msg"><div class="msg-author">👤 You</div>'
+    '<div class="msg-text">{content}</div></div>'
+)
+_ASSISTANT_TPL = (
+    '<div class="msg assistant-msg"><div class="msg-author">🤖 AI Assistant</div>'
+    '<div class="msg-text">{content}</div></div>'
+)
+_SLOTS_TPL = '<div class="slots-card"><div class="slots-title">📅 Available Time Slots</div>{slots}</div>'
+_SLOT_TPL = (
+    '<div class="slot-row"><span class="slot-label">Option {i}:</span>'
+    '<span class="slot-time"> {date} from {start_time} to {end_time}</span></div>'
+)
+_BOOKING_CONFIRMED_HTML = (
+    '<div class="booking-card"><div class="booking-title">✅ Booking Confirmed!</div>'
+    '<div class="booking-text">Your appointment has been successfully scheduled.</div></div>'
+)
+
+def _escape(text: Any) -> str:
+    """HTML-escape a value and keep it on one line."""
+    return html.escape(str(text)).replace("\n", "&#10;")
+
+def availability_slots_html(slots: List[Dict]) -> str:
+    """HTML for the available time slots card."""
+    return _SLOTS_TPL.format(slots="".join(
+        _SLOT_TPL.format(
+            i=i,
+            date=_escape(slot.get('date', 'N/A')),
+            start_time=_escape(slot.get('start_time', 'N/A')),
+            end_time=_escape(slot.get('end_time', 'N/A'))
+        )
+        for i, slot in enumerate(slots[:5], 1)
+    ))
+
+def history_html(messages: List[Dict]) -> str:
+    """HTML for the whole conversation, so it can be sent as one element."""
+    parts = []
+    for message in messages:
+        if message["role"] == "user":
+            parts.append(_USER_TPL.format(content=_escape(message["content"])))
+        else:
+            parts.append(_ASSISTANT_TPL.format(content=_escape(message["content"])))
+            
+            # Additional information if available
+            if message.get("available_slots"):
+                parts.append(availability_slots_html(message["available_slots"]))
+            
+            if message.get("booking_confirmed"):
+                parts.append(_BOOKING_CONFIRMED_HTML)
+    return "".join(parts)
 
 def main():
     """Main Streamlit application."""
+    # Re-sent on every run: Streamlit drops elements a run does not emit
+    st.markdown(_CSS, unsafe_allow_html=True)
     initialize_session_state()
     
     # Title and description
@@ -404,50 +458,19 @@ def main():
             "I need to schedule a team meeting for next week"
         ]
         
-        for example in example_messages:
-            if st.button(f"💬 {example}", key=f"example_{hash(example)}"):
+        for i, example in enumerate(example_messages):
+            if st.button(f"💬 {example}", key=f"example_{i}"):
                 st.session_state.example_message = example
         
         st.markdown("---")
         if st.button("🗑️ Clear Conversation"):
             st.session_state.messages = []
-            st.session_state.session_id = str(uuid.uuid4())
+            st.session_state.session_id = new_session_id()
             st.rerun()
     
-    # Chat container
+    # Chat container; drawn after the input is handled, but placed here
     chat_container = st.container()
     
-    # Display conversation history
-    with chat_container:
-        if st.session_state.messages:
-            for message in st.session_state.messages:
-                if message["role"] == "user":
-                    display_user_message(message["content"])
-                else:
-                    display_assistant_message(message["content"])
-                    
-                    # Display additional information if available
-                    if "available_slots" in message and message["available_slots"]:
-                        display_availability_slots(message["available_slots"])
-                    
-                    if "booking_confirmed" in message and message["booking_confirmed"]:
-                        display_booking_confirmation()
-        else:
-            # Show welcome message
-            col1, col2, col3 = st.columns([1, 2, 1])
-            with col2:
-                st.markdown("""
-                <div style="text-align: center; padding: 2rem; color: #666; border: 2px dashed #ddd; border-radius: 10px;">
-                    <h3 style="color: #333;">👋 Welcome to your AI Calendar Assistant!</h3>
-                    <p style="color: #666;">Start by typing a message below, like:</p>
-                    <div style="text-align: left; margin: 1rem 0;">
-                        <div style="margin: 0.5rem 0; color: #2196f3;">💬 "Hi, I'd like to schedule a meeting"</div>
-                        <div style="margin: 0.5rem 0; color: #2196f3;">💬 "Do you have time tomorrow?"</div>
-                        <div style="margin: 0.5rem 0; color: #2196f3;">💬 "Book a call for next Friday"</div>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-    
     # Chat input
     st.markdown("---")
     
@@ -483,9 +506,29 @@ def main():
             "extracted_info": response_data.get("extracted_info")
         }
         st.session_state.messages.append(assistant_message)
-        
-        # Rerun to show the new messages
-        st.rerun()
+    
+    # Fill the chat container last, so a new turn shows up in this same run
+    # instead of needing st.rerun() and a second pass over the whole script
+    with chat_container:
+        if st.session_state.messages:
+            col1, col2, col3 = st.columns([1, 3, 1])
+            with col2:
+                st.markdown(history_html(st.session_state.messages), unsafe_allow_html=True)
+        else:
+            # Show welcome message
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col2:
+                st.markdown("""
+                <div style="text-align: center; padding: 2rem; color: #666; border: 2px dashed #ddd; border-radius: 10px;">
+                    <h3 style="color: #333;">👋 Welcome to your AI Calendar Assistant!</h3>
+                    <p style="color: #666;">Start by typing a message below, like:</p>
+                    <div style="text-align: left; margin: 1rem 0;">
+                        <div style="margin: 0.5rem 0; color: #2196f3;">💬 "Hi, I'd like to schedule a meeting"</div>
+                        <div style="margin: 0.5rem 0; color: #2196f3;">💬 "Do you have time tomorrow?"</div>
+                        <div style="margin: 0.5rem 0; color: #2196f3;">💬 "Book a call for next Friday"</div>
+                    </div>
+                </div>
+                """, unsafe_allow_html=True)
     
     # Footer
     st.markdown("---")
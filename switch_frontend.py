@@ -4,11 +4,91 @@ Script to switch between different frontend versions.
 
 import os
 import sys
-import subprocess
-from dotenv import load_dotenv
+import signal
+import multiprocessing
 
-# Load environment variables
-load_dotenv()
+# Tab completion for the menu prompt; readline is not available on Windows
+try:
+    import readline
+except ImportError:
+    readline = None
+
+# Loads .env and parses the environment once
+from backend.config import settings
+
+MENU_OPTIONS = ("1", "2", "3", "4")
+
+def _complete_option(text: str, state: int):
+    """readline completer over the menu options."""
+    matches = [option for option in MENU_OPTIONS if option.startswith(text)]
+    return matches[state] if state < len(matches) else None
+
+# Idle interpreters kept ready with Streamlit already imported
+MAX_POOL = 1
+
+def _serve_frontend(requests):
+    """Pool worker: import Streamlit up front, then run the first app it is handed."""
+    # Ctrl+C meant for the running app reaches idle workers as well; they must outlive it
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from streamlit.web import cli as stcli
+    request = requests.get()
+    if request is None:
+        return
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    app_file, port = request
+    sys.argv = [
+        "streamlit", "run", f"frontend/{app_file}",
+        "--server.port", str(port),
+        "--server.headless", "false"
+    ]
+    try:
+        stcli.main()
+    except (SystemExit, KeyboardInterrupt):
+        pass
+
+class FrontendPool:
+    """
+    Prewarmed Streamlit workers for the menu.
+    
+    A Streamlit server cannot be restarted in the same process, so each
+    worker serves one app and exits; a replacement is warmed up while the
+    current app runs, ready for the next menu choice.
+    """
+    
+    def __init__(self, size: int = MAX_POOL):
+        self.size = size
+        self._context = multiprocessing.get_context("spawn" if os.name == "nt" else "forkserver")
+        self._idle = []
+        self._fill()
+    
+    def _fill(self):
+        # Replace workers that died while idle (killed, or failed to import Streamlit)
+        self._idle = [(worker, requests) for worker, requests in self._idle if worker.is_alive()]
+        while len(self._idle) < self.size:
+            requests = self._context.Queue()
+            worker = self._context.Process(target=_serve_frontend, args=(requests,))
+            worker.start()
+            self._idle.append((worker, requests))
+    
+    def run(self, app_file: str, port: int):
+        """Hand the app to an idle worker and block until it stops."""
+        self._fill()
+        worker, requests = self._idle.pop(0)
+        requests.put((app_file, port))
+        self._fill()
+        try:
+            worker.join()
+        except KeyboardInterrupt:
+            # Ctrl+C reaches the worker too; let Streamlit finish shutting down
+            worker.join()
+    
+    def close(self):
+        """Release the idle workers."""
+        for worker, requests in self._idle:
+            requests.put(None)
+        for worker, _ in self._idle:
+            worker.join(timeout=5)
+        self._idle = []
 
 def show_menu():
     """Show frontend options menu."""
@@ -20,38 +100,44 @@ def show_menu():
     print("4. Exit")
     print("=" * 50)
 
-def run_frontend(app_file: str, description: str):
+def run_frontend(pool: FrontendPool, app_file: str, description: str):
     """Run a specific frontend version."""
-    port = int(os.getenv("STREAMLIT_PORT", 8501))
-    
-    print(f"🚀 Starting {description} on http://localhost:{port}")
+    print(f"🚀 Starting {description} on http://localhost:{settings.STREAMLIT_PORT}")
     print("Press Ctrl+C to stop and return to menu")
     print("-" * 50)
     
     try:
-        subprocess.run([
-            sys.executable, "-m", "streamlit", "run", 
-            f"frontend/{app_file}", 
-            "--server.port", str(port),
-            "--server.headless", "false"
-        ])
+        pool.run(app_file, settings.STREAMLIT_PORT)
     except KeyboardInterrupt:
-        print("\n⏹️  Frontend stopped")
+        pass
+    print("\n⏹️  Frontend stopped")
 
 def main():
     """Main menu function."""
+    if readline is not None:
+        readline.set_completer(_complete_option)
+        readline.parse_and_bind("tab: complete")
+    
+    pool = FrontendPool()
+    menu_shown = False
     while True:
-        show_menu()
+        # The menu stays on screen until a frontend has run over it
+        if not menu_shown:
+            show_menu()
+            menu_shown = True
         
         try:
             choice = input("Select an option (1-4): ").strip()
             
             if choice == "1":
-                run_frontend("app.py", "Original Frontend")
+                run_frontend(pool, "app.py", "Original Frontend")
+                menu_shown = False
             elif choice == "2":
-                run_frontend("app_colored.py", "Colored Frontend")
+                run_frontend(pool, "app_colored.py", "Colored Frontend")
+                menu_shown = False
             elif choice == "3":
-                run_frontend("app_v2.py", "Chat Frontend")
+                run_frontend(pool, "app_v2.py", "Chat Frontend")
+                menu_shown = False
             elif choice == "4":
                 print("👋 Goodbye!")
                 break
@@ -65,6 +151,8 @@ def main():
         except Exception as e:
             print(f"❌ Error: {e}")
             input("Press Enter to continue...")
+            menu_shown = False
+    pool.close()
 
 if __name__ == "__main__":
     main()
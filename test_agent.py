@@ -5,33 +5,132 @@ Tests various conversation scenarios and edge cases.
 
 import os
 import sys
+import uuid
 import asyncio
-import requests
+import httpx
 import json
+from collections import Counter, deque
+from itertools import count
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Sequence
+
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+# HTTP/2 needs the optional h2 package (httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+# Exchanges kept in memory for inspection; the summary counts cover every exchange
+MAX_HISTORY = 256
+
+# Full agent replies and extracted info on a terminal or with TEST_VERBOSE=1;
+# redirected runs (CI) get a truncated reply and skip pretty-printing the info
+VERBOSE = os.getenv("TEST_VERBOSE") == "1" or sys.stdout.isatty()
+SHORT_REPLY_CHARS = 80
+
+# Set TEST_ROLLOUT to a file path to append every exchange to it as JSON lines
+ROLLOUT_PATH = os.getenv("TEST_ROLLOUT")
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 API_BASE_URL = "http://localhost:8000"
 
+# Session ids are "test_session_<run>_<n>"; the run prefix keeps them apart from
+# sessions left in the backend's store by earlier runs
+_RUN_ID = uuid.uuid4().hex[:8]
+_sid_counter = count()
+
+def new_session_id() -> str:
+    """Next unique test session id for this run."""
+    return f"test_session_{_RUN_ID}_{next(_sid_counter)}"
+
+# Greetings sent in one session
+_GREETING_MSGS = (
+    "Hello",
+    "Hi there",
+    "Good morning"
+)
+
+# Independent booking requests, each sent in its own session
+_BOOKING_SCENARIOS = (
+    "I want to schedule a meeting",
+    "Do you have any free time tomorrow?",
+    "Book a call for next Friday at 2 PM",
+    "I need to schedule a 30-minute meeting for next week",
+    "Can we meet sometime this afternoon?",
+    "Schedule a team meeting for Monday morning"
+)
+
+# Turns of one booking conversation, in order
+_FLOW_STEPS = (
+    "Hi, I'd like to schedule a meeting",
+    "Tomorrow afternoon would be great",
+    "Let's make it a 1-hour meeting",
+    "The first option looks good",
+    "Yes, please book it"
+)
+
+# Unusual inputs, each sent in its own session
+_EDGE_CASES = (
+    "",  # Empty message
+    "What's the weather like?",  # Unrelated question
+    "Book a meeting for yesterday",  # Past date
+    "Schedule something for 25:00",  # Invalid time
+    "I want to cancel everything",  # Cancellation request
+    "Book 50 meetings for tomorrow",  # Unrealistic request
+)
+
 class AgentTester:
     """Test class for the booking agent."""
     
     def __init__(self):
-        self.session_id = "test_session_" + str(int(datetime.now().timestamp()))
-        self.conversation_history = []
+        self.session_id = new_session_id()
+        self.conversation_history: "deque[Dict[str, Any]]" = deque(maxlen=MAX_HISTORY)
+        # Running totals for print_summary, updated by record()
+        self.interactions = 0
+        self.intent_counts: Counter = Counter()
+        self.bookings_confirmed = 0
+        # Full per-exchange log on disk, so nothing beyond MAX_HISTORY has to stay in memory
+        self.rollout = open(ROLLOUT_PATH, "ab") if ROLLOUT_PATH else None
+        # (start_date, end_date, duration_minutes) -> /availability result
+        self.availability_cache: Dict[tuple, Dict[str, Any]] = {}
+        # One pooled client for every test call; concurrent requests share its streams over
+        # HTTP/2 when the server negotiates it and fall back to the pool's HTTP/1.1 connections
+        self.client = httpx.AsyncClient(
+            base_url=API_BASE_URL, timeout=30,
+            transport=httpx.AsyncHTTPTransport(
+                http2=HTTP2_AVAILABLE, retries=2,
+                limits=httpx.Limits(max_keepalive_connections=16, max_connections=16)
+            )
+        )
     
-    def check_api_status(self) -> bool:
+    async def check_api_status(self) -> bool:
         """Check if the API is running."""
         try:
-            response = requests.get(f"{API_BASE_URL}/health", timeout=5)
+            response = await self.client.head("/health", timeout=5)
+            if response.status_code == 405:
+                # Backend without the HEAD route; the body is not needed
+                response = await self.client.get("/health", timeout=5)
             return response.status_code == 200
-        except requests.exceptions.RequestException:
+        except httpx.HTTPError:
             return False
     
-    def send_message(self, message: str) -> Dict[str, Any]:
+    async def send_message(self, message: str) -> Dict[str, Any]:
         """Send a message to the agent."""
         try:
             payload = {
@@ -39,62 +138,99 @@ class AgentTester:
                 "session_id": self.session_id
             }
             
-            response = requests.post(
-                f"{API_BASE_URL}/chat",
-                json=payload,
-                timeout=30
+            response = await self.client.post(
+                "/chat",
+                content=_json_dumps(payload),
+                headers=JSON_HEADERS
             )
             
             if response.status_code == 200:
-                result = response.json()
-                self.conversation_history.append({
-                    "user": message,
-                    "agent": result.get("response", ""),
-                    "intent": result.get("intent"),
-                    "extracted_info": result.get("extracted_info"),
-                    "available_slots": result.get("available_slots"),
-                    "booking_confirmed": result.get("booking_confirmed", False)
-                })
+                result = _json_loads(response.content)
+                self.record(message, result)
                 return result
             else:
                 print(f"❌ API Error: {response.status_code} - {response.text}")
                 return {}
         
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"❌ Connection Error: {e}")
             return {}
     
+    def record(self, message: str, result: Dict[str, Any]):
+        """Add one exchange to the recent history and the summary totals."""
+        self.conversation_history.append({
+            "user": message,
+            "agent": result.get("response", ""),
+            "intent": result.get("intent"),
+            "extracted_info": result.get("extracted_info"),
+            "available_slots": result.get("available_slots"),
+            "booking_confirmed": result.get("booking_confirmed", False)
+        })
+        if self.rollout is not None:
+            self.rollout.write(_json_dumps({"user": message, "response": result}) + b"\n")
+        self.interactions += 1
+        if result.get("intent"):
+            self.intent_counts[result["intent"]] += 1
+        if result.get("booking_confirmed"):
+            self.bookings_confirmed += 1
+    
+    async def send_independent(self, messages: Sequence[str]) -> List[Dict[str, Any]]:
+        """Send each message in its own new session, all at once; results keep the input order."""
+        async def post(message: str) -> Dict[str, Any]:
+            # A fresh session per message keeps server-side state isolated
+            payload = {"message": message, "session_id": new_session_id()}
+            try:
+                response = await self.client.post("/chat", content=_json_dumps(payload), headers=JSON_HEADERS)
+                if response.status_code == 200:
+                    return _json_loads(response.content)
+                print(f"❌ API Error: {response.status_code} - {response.text}")
+            except httpx.HTTPError as e:
+                print(f"❌ Connection Error: {e}")
+            return {}
+        
+        results = await asyncio.gather(*(post(message) for message in messages))
+        
+        for message, result in zip(messages, results):
+            if result:
+                self.record(message, result)
+        return results
+    
     def print_conversation_step(self, user_msg: str, agent_response: Dict[str, Any]):
-        """Print a conversation step."""
-        print(f"\n👤 User: {user_msg}")
-        print(f"🤖 Agent: {agent_response.get('response', 'No response')}")
+        """Print a conversation step with a single write, so concurrent steps don't interleave."""
+        intent = agent_response.get('intent')
+        info = agent_response.get('extracted_info')
+        slots = agent_response.get('available_slots')
+        
+        reply = agent_response.get('response', 'No response')
+        if not VERBOSE and len(reply) > SHORT_REPLY_CHARS:
+            reply = reply[:SHORT_REPLY_CHARS] + "..."
+        
+        lines = [
+            f"\n👤 User: {user_msg}",
+            f"🤖 Agent: {reply}"
+        ]
         
-        if agent_response.get('intent'):
-            print(f"🎯 Intent: {agent_response['intent']}")
+        if intent:
+            lines.append(f"🎯 Intent: {intent}")
         
-        if agent_response.get('extracted_info'):
-            print(f"📝 Extracted: {json.dumps(agent_response['extracted_info'], indent=2)}")
+        if info and VERBOSE:
+            lines.append(f"📝 Extracted: {json.dumps(info, indent=2)}")
         
-        if agent_response.get('available_slots'):
-            print(f"📅 Available slots: {len(agent_response['available_slots'])} found")
+        if slots:
+            lines.append(f"📅 Available slots: {len(slots)} found")
         
         if agent_response.get('booking_confirmed'):
-            print("✅ Booking confirmed!")
+            lines.append("✅ Booking confirmed!")
         
-        print("-" * 60)
+        lines.append("-" * 60)
+        sys.stdout.write("\n".join(lines) + "\n")
     
-    def test_basic_greeting(self):
+    async def test_basic_greeting(self):
         """Test basic greeting scenario."""
         print("\n🧪 Testing Basic Greeting...")
         
-        test_messages = [
-            "Hello",
-            "Hi there",
-            "Good morning"
-        ]
-        
-        for msg in test_messages:
-            response = self.send_message(msg)
+        for msg in _GREETING_MSGS:
+            response = await self.send_message(msg)
             self.print_conversation_step(msg, response)
             
             # Check if response is appropriate
@@ -103,103 +239,93 @@ class AgentTester:
             else:
                 print("⚠️  Greeting response could be improved")
     
-    def test_booking_scenarios(self):
+    async def test_booking_scenarios(self):
         """Test various booking scenarios."""
         print("\n🧪 Testing Booking Scenarios...")
         
-        scenarios = [
-            "I want to schedule a meeting",
-            "Do you have any free time tomorrow?",
-            "Book a call for next Friday at 2 PM",
-            "I need to schedule a 30-minute meeting for next week",
-            "Can we meet sometime this afternoon?",
-            "Schedule a team meeting for Monday morning"
-        ]
-        
-        for scenario in scenarios:
+        # Scenarios are independent, so they run concurrently in separate sessions
+        responses = await self.send_independent(_BOOKING_SCENARIOS)
+        for scenario, response in zip(_BOOKING_SCENARIOS, responses):
             print(f"\n📋 Scenario: {scenario}")
-            response = self.send_message(scenario)
             self.print_conversation_step(scenario, response)
-            
-            # Reset session for next scenario
-            self.session_id = "test_session_" + str(int(datetime.now().timestamp()))
     
-    def test_conversation_flow(self):
+    async def test_conversation_flow(self):
         """Test a complete conversation flow."""
         print("\n🧪 Testing Complete Conversation Flow...")
         
-        conversation_steps = [
-            "Hi, I'd like to schedule a meeting",
-            "Tomorrow afternoon would be great",
-            "Let's make it a 1-hour meeting",
-            "The first option looks good",
-            "Yes, please book it"
-        ]
-        
-        for step in conversation_steps:
-            response = self.send_message(step)
+        for step in _FLOW_STEPS:
+            response = await self.send_message(step)
             self.print_conversation_step(step, response)
     
-    def test_edge_cases(self):
+    async def test_edge_cases(self):
         """Test edge cases and error handling."""
         print("\n🧪 Testing Edge Cases...")
         
-        edge_cases = [
-            "",  # Empty message
-            "What's the weather like?",  # Unrelated question
-            "Book a meeting for yesterday",  # Past date
-            "Schedule something for 25:00",  # Invalid time
-            "I want to cancel everything",  # Cancellation request
-            "Book 50 meetings for tomorrow",  # Unrealistic request
-        ]
-        
-        for case in edge_cases:
+        # Each case gets its own session, so they run concurrently
+        responses = await self.send_independent(_EDGE_CASES)
+        for case, response in zip(_EDGE_CASES, responses):
             print(f"\n🔍 Edge case: '{case}'")
-            response = self.send_message(case)
             self.print_conversation_step(case, response)
-            
-            # Reset session for next case
-            self.session_id = "test_session_" + str(int(datetime.now().timestamp()))
     
-    def test_api_endpoints(self):
+    async def test_api_endpoints(self):
         """Test direct API endpoints."""
         print("\n🧪 Testing API Endpoints...")
         
         # Test health endpoint
         try:
-            response = requests.get(f"{API_BASE_URL}/health")
+            response = await self.client.get("/health")
             if response.status_code == 200:
                 print("✅ Health endpoint working")
-                print(f"   Response: {response.json()}")
+                print(f"   Response: {_json_loads(response.content)}")
             else:
                 print(f"❌ Health endpoint failed: {response.status_code}")
         except Exception as e:
             print(f"❌ Health endpoint error: {e}")
         
-        # Test availability endpoint
+        # Test availability endpoint; whole-day window so the cache key is stable for the day
         try:
-            payload = {
-                "start_date": (datetime.now() + timedelta(days=1)).isoformat(),
-                "end_date": (datetime.now() + timedelta(days=7)).isoformat(),
-                "duration_minutes": 60
-            }
-            response = requests.post(f"{API_BASE_URL}/availability", json=payload)
-            if response.status_code == 200:
-                result = response.json()
+            today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            status, result = await self.fetch_availability(
+                (today + timedelta(days=1)).isoformat(),
+                (today + timedelta(days=7)).isoformat(),
+                60
+            )
+            if status == 200:
                 print("✅ Availability endpoint working")
                 print(f"   Found {len(result.get('available_slots', []))} slots")
             else:
-                print(f"❌ Availability endpoint failed: {response.status_code}")
+                print(f"❌ Availability endpoint failed: {status}")
         except Exception as e:
             print(f"❌ Availability endpoint error: {e}")
     
-    def run_all_tests(self):
+    async def fetch_availability(self, start_date: str, end_date: str, duration_minutes: int):
+        """POST /availability, reusing a successful answer for the same (range, duration)."""
+        key = (start_date, end_date, duration_minutes)
+        if key in self.availability_cache:
+            return 200, self.availability_cache[key]
+        
+        payload = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "duration_minutes": duration_minutes
+        }
+        response = await self.client.post(
+            "/availability", content=_json_dumps(payload), headers=JSON_HEADERS
+        )
+        if response.status_code != 200:
+            return response.status_code, {}
+        
+        result = _json_loads(response.content)
+        self.availability_cache[key] = result
+        return 200, result
+    
+    async def run_all_tests(self):
         """Run all tests."""
         print("🚀 Starting AI Calendar Booking Agent Tests")
         print("=" * 60)
         
         # Check if API is running
-        if not self.check_api_status():
+        if not await self.check_api_status():
             print("❌ API is not running! Please start the backend server first.")
             print("   Run: python run_backend.py")
             return
@@ -208,44 +334,56 @@ class AgentTester:
         
         # Run tests
         try:
-            self.test_basic_greeting()
-            self.test_booking_scenarios()
-            self.test_conversation_flow()
-            self.test_edge_cases()
-            self.test_api_endpoints()
+            await self.test_basic_greeting()
+            await self.test_booking_scenarios()
+            await self.test_conversation_flow()
+            await self.test_edge_cases()
+            await self.test_api_endpoints()
             
             print("\n" + "=" * 60)
             print("🎉 All tests completed!")
-            print(f"📊 Total conversations tested: {len(self.conversation_history)}")
+            print(f"📊 Total conversations tested: {self.interactions}")
             
         except KeyboardInterrupt:
             print("\n⏹️  Tests interrupted by user")
         except Exception as e:
             print(f"\n❌ Test error: {e}")
     
+    async def close(self):
+        """Close the pooled HTTP client and the rollout file."""
+        await self.client.aclose()
+        if self.rollout is not None:
+            self.rollout.close()
+    
     def print_summary(self):
         """Print test summary."""
-        if not self.conversation_history:
+        if not self.interactions:
             return
         
         print("\n📋 Test Summary:")
-        print(f"   Total interactions: {len(self.conversation_history)}")
+        print(f"   Total interactions: {self.interactions}")
         
-        intents = [conv.get('intent') for conv in self.conversation_history if conv.get('intent')]
-        if intents:
-            print(f"   Detected intents: {set(intents)}")
+        if self.intent_counts:
+            print(f"   Detected intents: {set(self.intent_counts)}")
         
-        bookings_confirmed = sum(1 for conv in self.conversation_history if conv.get('booking_confirmed'))
-        if bookings_confirmed:
-            print(f"   Bookings confirmed: {bookings_confirmed}")
+        if self.bookings_confirmed:
+            print(f"   Bookings confirmed: {self.bookings_confirmed}")
 
 
-def main():
-    """Main test function."""
+async def run_tests():
+    """Run the suite on one event loop and client."""
     tester = AgentTester()
-    tester.run_all_tests()
+    try:
+        await tester.run_all_tests()
+    finally:
+        await tester.close()
     tester.print_summary()
 
 
+def main():
+    """Main test function."""
+    asyncio.run(run_tests())
+
+
 if __name__ == "__main__":
     main()
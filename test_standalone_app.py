@@ -9,42 +9,56 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # Import the MockBackend class from streamlit_app
 from streamlit_app import MockBackend
 
+# Shared by both tests; they use different session ids, so their state doesn't mix
+_BACKEND = MockBackend()
+
+# Turns of one booking conversation, in order
+_CONVERSATION = (
+    "Hello, I'd like to schedule a meeting",
+    "Tomorrow afternoon would be great", 
+    "The first option looks good",
+    "Yes, please confirm the booking"
+)
+
+# (case name, message) pairs, each sent in its own session
+_EDGE_CASES = (
+    ("Empty message", ""),
+    ("Just greeting", "Hi"),
+    ("Vague request", "I need help"),
+    ("Specific request", "Book a meeting for tomorrow at 2 PM"),
+    ("Selection without context", "Option 1"),
+)
+
 def test_conversation():
     """Test the conversation flow."""
     print("🧪 Testing Standalone App Conversation Logic")
     print("=" * 60)
     
-    # Initialize mock backend
-    backend = MockBackend()
     session_id = "test_session"
     
-    # Test conversation flow
-    test_messages = [
-        "Hello, I'd like to schedule a meeting",
-        "Tomorrow afternoon would be great", 
-        "The first option looks good",
-        "Yes, please confirm the booking"
-    ]
+    # Process every turn in one pass, then print
+    responses = _BACKEND.process_chat_batch(_CONVERSATION, session_id)
     
-    for i, message in enumerate(test_messages, 1):
-        print(f"\n👤 Step {i}: {message}")
-        
-        # Process message
-        response = backend.process_chat(message, session_id)
+    for i, (message, response) in enumerate(zip(_CONVERSATION, responses), 1):
+        lines = [
+            f"\n👤 Step {i}: {message}",
+            f"🤖 Response: {response['response']}",
+            f"🎯 Intent: {response['intent']}",
+            f"📝 Extracted: {response['extracted_info']}"
+        ]
         
-        print(f"🤖 Response: {response['response']}")
-        print(f"🎯 Intent: {response['intent']}")
-        print(f"📝 Extracted: {response['extracted_info']}")
-        
-        if response.get('available_slots'):
-            print(f"📅 Available slots: {len(response['available_slots'])}")
-            for j, slot in enumerate(response['available_slots'][:2], 1):
-                print(f"   {j}. {slot['date']} {slot['start_time']}-{slot['end_time']}")
+        slots = response.get('available_slots')
+        if slots:
+            lines.append(f"📅 Available slots: {len(slots)}")
+            for j, slot in enumerate(slots[:2], 1):
+                lines.append(f"   {j}. {slot['date']} {slot['start_time']}-{slot['end_time']}")
         
         if response.get('booking_confirmed'):
-            print("✅ Booking confirmed!")
+            lines.append("✅ Booking confirmed!")
         
-        print("-" * 40)
+        lines.append("-" * 40)
+        # One write per step
+        sys.stdout.write("\n".join(lines) + "\n")
     
     print("\n🎉 Test completed!")
 
@@ -53,19 +67,9 @@ def test_edge_cases():
     print("\n🔍 Testing Edge Cases")
     print("=" * 60)
     
-    backend = MockBackend()
-    
-    edge_cases = [
-        ("Empty message", ""),
-        ("Just greeting", "Hi"),
-        ("Vague request", "I need help"),
-        ("Specific request", "Book a meeting for tomorrow at 2 PM"),
-        ("Selection without context", "Option 1"),
-    ]
-    
-    for case_name, message in edge_cases:
+    for case_name, message in _EDGE_CASES:
         print(f"\n🔍 {case_name}: '{message}'")
-        response = backend.process_chat(message, f"test_{case_name}")
+        response = _BACKEND.process_chat(message, f"test_{case_name}")
         print(f"🤖 Response: {response['response'][:100]}...")
         print(f"🎯 Intent: {response['intent']}")
 
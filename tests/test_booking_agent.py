@@ -0,0 +1,104 @@
+"""
+Tests for the LangGraph booking agent, with the LLM and calendar stubbed out.
+"""
+
+import asyncio
+import json
+from datetime import date, datetime
+from unittest import mock
+
+import pytest
+from langchain_core.messages import AIMessageChunk
+
+from backend.config import settings
+from backend.agent import booking_agent
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    with mock.patch.object(booking_agent, "GoogleCalendarService"), \
+            mock.patch.object(booking_agent.BookingAgent, "_configure_llm_cache"):
+        agent = booking_agent.BookingAgent()
+
+    agent.prompts = []
+
+    async def fake_llm(prompt_messages):
+        agent.prompts.append(prompt_messages[-1].content)
+        return json.dumps({"intent": "other", "extracted": {}, "reply": f"reply {len(agent.prompts)}"})
+
+    agent.batcher.ainvoke = fake_llm
+    return agent
+
+
+def history(agent, session_id: str):
+    return agent.graph.get_state({"configurable": {"thread_id": session_id}}).values["messages"]
+
+
+def test_history_accumulates_across_turns(agent):
+    for n in range(3):
+        agent.process_message(f"question {n}", "s1")
+
+    assert [m["content"] for m in history(agent, "s1")] == [
+        "question 0", "reply 1", "question 1", "reply 2", "question 2", "reply 3"
+    ]
+
+
+def test_history_is_capped(agent):
+    turns = settings.MAX_CONVERSATION_HISTORY
+    for n in range(turns):
+        agent.process_message(f"question {n}", "s1")
+
+    messages = history(agent, "s1")
+    assert len(messages) == settings.MAX_CONVERSATION_HISTORY
+    assert messages[-2:] == [
+        {"role": "user", "content": f"question {turns - 1}"},
+        {"role": "assistant", "content": f"reply {turns}"}
+    ]
+
+
+def test_sessions_keep_separate_histories(agent):
+    agent.process_message("about s1", "s1")
+    agent.process_message("about s2", "s2")
+
+    assert [m["content"] for m in history(agent, "s2")] == ["about s2", "reply 2"]
+
+
+def test_prompt_carries_the_last_three_user_messages(agent):
+    for n in range(5):
+        agent.process_message(f"question {n}", "s1")
+
+    conversation = agent.prompts[-1].split("Conversation so far:\n")[1].split("\n\nLatest message:")[0]
+    assert conversation.splitlines() == ["question 2", "question 3", "question 4"]
+
+
+def test_free_slots_match_the_calendar_service(agent):
+    tz = settings.TIMEZONE_OBJ
+    monday = date(2024, 7, 1)
+    busy = [{"start": datetime(2024, 7, 1, 9, tzinfo=tz).isoformat(),
+             "end": datetime(2024, 7, 1, 13, tzinfo=tz).isoformat()}]
+
+    slots = list(agent._iter_free_slots(busy, monday, date(2024, 7, 2), 60))
+
+    # One slot per free gap: Monday after the busy block, then Tuesday from the start of the day
+    assert [(slot['date'], slot['start_time']) for slot in slots] == [
+        ("2024-07-01", "01:00 PM"), ("2024-07-02", "09:00 AM")
+    ]
+
+
+def test_streamed_turn_returns_the_final_state(agent):
+    async def fake_stream(prompt_messages):
+        reply = json.dumps({"intent": "other", "extracted": {}, "reply": "streamed reply"})
+        for start in range(0, len(reply), 8):
+            yield AIMessageChunk(content=reply[start:start + 8])
+
+    agent.batcher.astream = fake_stream
+
+    async def run():
+        return [event async for event in agent.astream_message("question", "s1")]
+
+    events = asyncio.run(run())
+
+    assert events[-1]["type"] == "done"
+    assert events[-1]["result"]["response"] == "streamed reply"
+    assert [m["content"] for m in history(agent, "s1")] == ["question", "streamed reply"]
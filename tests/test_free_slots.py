@@ -0,0 +1,97 @@
+"""
+Tests for FreeSlotFinder.
+"""
+
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from backend.calendar.free_slots import FreeSlotFinder
+
+TZ = ZoneInfo("America/New_York")
+HOUR = timedelta(hours=1)
+
+
+def at(hour: int, minute: int = 0, day: int = 1, month: int = 7) -> datetime:
+    return datetime(2024, month, day, hour, minute, tzinfo=TZ)
+
+
+def working_day(busy, day=1, month=7) -> FreeSlotFinder:
+    return FreeSlotFinder(busy, at(9, day=day, month=month), at(17, day=day, month=month))
+
+
+def test_empty_day_is_one_gap():
+    finder = working_day([])
+
+    assert list(finder.gaps()) == [(at(9), at(17))]
+    assert list(finder.free_slots(HOUR)) == [at(9)]
+
+
+def test_overlapping_and_touching_busy_blocks_merge():
+    finder = working_day([
+        (at(13), at(14)),
+        (at(10), at(12)),
+        (at(11), at(13)),       # overlaps 10-12, touches 13-14
+        (at(10, 30), at(11)),   # inside 10-12
+    ])
+
+    assert list(finder.gaps()) == [(at(9), at(10)), (at(14), at(17))]
+
+
+def test_busy_blocks_are_clipped_to_working_hours():
+    finder = working_day([
+        (at(7), at(9, 30)),         # starts before the day
+        (at(16, 30), at(19)),       # ends after the day
+        (at(18), at(20)),           # entirely outside
+        (at(23, day=30, month=6), at(9, 15)),  # from the previous evening
+    ])
+
+    assert list(finder.gaps()) == [(at(9, 30), at(16, 30))]
+
+
+def test_busy_blocks_in_other_timezones_are_compared_in_real_time():
+    # 15:00-16:00 UTC is 11:00-12:00 in New York (EDT, UTC-4)
+    utc_busy = (datetime(2024, 7, 1, 15, tzinfo=timezone.utc), datetime(2024, 7, 1, 16, tzinfo=timezone.utc))
+
+    finder = working_day([utc_busy])
+
+    assert list(finder.gaps()) == [(at(9), at(11)), (at(12), at(17))]
+
+
+def test_free_slots_skip_gaps_too_short_for_the_meeting():
+    finder = working_day([(at(9, 30), at(16))])
+
+    assert list(finder.free_slots(HOUR)) == [at(16)]
+    assert list(finder.free_slots(timedelta(minutes=30))) == [at(9), at(16)]
+
+
+def test_first_free_and_conflicts():
+    finder = working_day([(at(10), at(12)), (at(13), at(14))])
+
+    assert finder.first_free(HOUR, after=at(10, 30)) == at(12)
+    assert finder.first_free(2 * HOUR, after=at(10, 30)) == at(14)
+    assert finder.first_free(9 * HOUR) is None
+    assert finder.check_conflict(at(11), at(11, 30))
+    assert finder.check_conflict(at(12, 30), at(13, 30))
+    assert not finder.check_conflict(at(12), at(13))
+    assert not finder.check_conflict(at(9), at(10))
+
+
+def test_spring_forward_day_has_one_hour_less():
+    # 2024-03-10: clocks jump from 02:00 to 03:00, so 00:00-04:00 is only three hours
+    day_start, day_end = at(0, day=10, month=3), at(4, day=10, month=3)
+    finder = FreeSlotFinder([], day_start, day_end)
+
+    assert list(finder.free_slots(3 * HOUR)) == [day_start]
+    assert list(finder.free_slots(timedelta(hours=3, minutes=30))) == []
+
+
+def test_fall_back_day_has_one_hour_more():
+    # 2024-11-03: clocks fall back from 02:00 to 01:00, so 00:00-04:00 is five hours
+    day_start, day_end = at(0, day=3, month=11), at(4, day=3, month=11)
+    finder = FreeSlotFinder([(day_start, day_start + HOUR)], day_start, day_end)
+
+    # The hour after the busy block is the first (EDT) 01:00, four real hours before 04:00 EST
+    (gap_start, gap_end), = finder.gaps()
+    assert gap_start.utcoffset() == timedelta(hours=-4)
+    assert gap_end.astimezone(timezone.utc) - gap_start.astimezone(timezone.utc) == 4 * HOUR
+    assert list(finder.free_slots(timedelta(hours=3, minutes=30))) == [gap_start]
@@ -0,0 +1,44 @@
+"""
+Tests for the Google Calendar service's busy-period cache, with the API stubbed out.
+"""
+
+from datetime import date
+from unittest import mock
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from backend.calendar.google_calendar import GoogleCalendarService
+
+WORKING_HOURS = (9, 17)
+BUSY = {"start": "2024-07-01T10:00:00-04:00", "end": "2024-07-01T11:00:00-04:00"}
+
+
+def make_service(query_busy) -> GoogleCalendarService:
+    with mock.patch.object(GoogleCalendarService, "_authenticate"):
+        service = GoogleCalendarService()
+    service._query_busy = mock.Mock(side_effect=query_busy)
+    return service
+
+
+def test_busy_periods_are_cached_per_day():
+    service = make_service(lambda *args: [BUSY])
+
+    first = service._busy_by_day("primary", date(2024, 7, 1), date(2024, 7, 2), WORKING_HOURS)
+    again = service._busy_by_day("primary", date(2024, 7, 1), date(2024, 7, 2), WORKING_HOURS)
+
+    assert len(first[date(2024, 7, 1)]) == 1 and not first.get(date(2024, 7, 2))
+    assert again[date(2024, 7, 1)] == first[date(2024, 7, 1)]
+    assert service._query_busy.call_count == 1
+
+
+def test_failed_query_is_not_cached_as_free():
+    error = HttpError(httplib2.Response({"status": 500}), b"backend error")
+    service = make_service([error, [BUSY]])
+
+    failed = service._busy_by_day("primary", date(2024, 7, 1), date(2024, 7, 2), WORKING_HOURS)
+    retried = service._busy_by_day("primary", date(2024, 7, 1), date(2024, 7, 2), WORKING_HOURS)
+
+    assert not failed
+    assert len(retried[date(2024, 7, 1)]) == 1
+    assert service._query_busy.call_count == 2
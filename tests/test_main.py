@@ -0,0 +1,54 @@
+"""
+Tests for the chat endpoints' response shape, with the agent stubbed out.
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.session_store import MemorySessionStore
+
+
+class FakeAgent:
+    """Rule-based agent stand-in: no slots, intent or booking in its reply."""
+
+    def process_message(self, message: str, session_id: str):
+        return {"response": f"echo {message}", "extracted_info": {}}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "session_store", MemorySessionStore())
+    main.app.dependency_overrides[main.get_booking_agent] = FakeAgent
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
+
+
+def done_event(body: str):
+    """Payload of the final SSE event."""
+    return json.loads(body.split("event: done\ndata: ")[1].split("\n", 1)[0])
+
+
+def test_chat_always_sends_booking_confirmed(client):
+    reply = client.post("/chat", json={"message": "hi", "session_id": "s1"}).json()
+
+    assert reply["booking_confirmed"] is False
+    assert reply["response"] == "echo hi" and reply["session_id"] == "s1"
+    assert reply["extracted_info"] == {}
+
+
+def test_include_only_drops_the_optional_fields(client):
+    requests = {
+        "/chat": {"message": "hi", "session_id": "s1", "include": []},
+        "/chat/batch": {"messages": ["hi"], "session_id": "s1", "include": []},
+        "/chat/stream": {"message": "hi", "session_id": "s1", "include": []},
+    }
+
+    chat = client.post("/chat", json=requests["/chat"]).json()
+    batch = client.post("/chat/batch", json=requests["/chat/batch"]).json()["responses"][0]
+    stream = done_event(client.post("/chat/stream", json=requests["/chat/stream"]).text)
+
+    for reply in (chat, batch, stream):
+        assert reply == {"response": "echo hi", "session_id": "s1", "booking_confirmed": False}
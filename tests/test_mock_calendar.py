@@ -0,0 +1,20 @@
+"""
+Tests for the mock calendar's created-event index.
+"""
+
+from datetime import datetime, timedelta
+
+from backend.calendar.mock_calendar import MockCalendarService
+
+
+def test_naive_and_aware_bookings_are_kept_in_order():
+    calendar = MockCalendarService()
+    tomorrow = datetime.now(calendar.timezone).replace(microsecond=0) + timedelta(days=1)
+
+    # The agent books aware slots, /book can pass naive times in the calendar's timezone
+    calendar.create_event("aware", tomorrow + timedelta(hours=2), tomorrow + timedelta(hours=3))
+    calendar.create_event("naive", tomorrow.replace(tzinfo=None), tomorrow.replace(tzinfo=None) + timedelta(hours=1))
+    calendar.create_event("past", tomorrow - timedelta(days=2), tomorrow - timedelta(days=2, hours=-1))
+
+    created = [event for event in calendar.get_upcoming_events() if not event['id'].startswith('mock_event_')]
+    assert [event['summary'] for event in created] == ["naive", "aware"]
@@ -0,0 +1,129 @@
+"""
+Tests for the session store backends.
+"""
+
+import asyncio
+
+import pytest
+
+from backend.config import settings
+from backend.session_store import MemorySessionStore, RedisSessionStore, SessionStore, SQLiteSessionStore
+
+
+def make_redis_store() -> RedisSessionStore:
+    fakeredis = pytest.importorskip("fakeredis")
+    store = RedisSessionStore.__new__(RedisSessionStore)
+    store.ttl = 3600
+    store._redis = fakeredis.FakeAsyncRedis()
+    return store
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        store = MemorySessionStore()
+    elif request.param == "sqlite":
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    else:
+        store = make_redis_store()
+    yield store
+    asyncio.run(store.close())
+
+
+def turn(n: int):
+    return [{"role": "user", "content": f"q{n}"}, {"role": "assistant", "content": f"a{n}"}]
+
+
+def contents(record):
+    return [message["content"] for message in record["messages"]]
+
+
+def test_append_creates_the_session(store):
+    async def run():
+        await store.append("s1", turn(0))
+        return await store.get("s1"), await store.keys()
+
+    record, keys = asyncio.run(run())
+
+    assert contents(record) == ["q0", "a0"]
+    assert record["state"] == "active" and "created_at" in record
+    assert keys == ["s1"]
+
+
+def test_concurrent_appends_keep_every_message(store):
+    async def run():
+        await asyncio.gather(*(store.append("s1", turn(n)) for n in range(8)))
+        return await store.get("s1")
+
+    messages = contents(asyncio.run(run()))
+
+    assert len(messages) == 16
+    # Each turn's question and answer stay together
+    for i in range(0, 16, 2):
+        assert messages[i + 1] == "a" + messages[i][1:]
+
+
+def test_append_keeps_only_recent_history(store):
+    limit = settings.MAX_CONVERSATION_HISTORY
+
+    async def run():
+        for n in range(limit):
+            await store.append("s1", turn(n))
+        return await store.get("s1")
+
+    messages = contents(asyncio.run(run()))
+
+    assert len(messages) == limit
+    assert messages[-1] == f"a{limit - 1}"
+
+
+def test_put_get_and_delete(store):
+    async def run():
+        await store.put("s1", {"created_at": "2024-01-01T00:00:00", "messages": turn(0), "state": "active"})
+        record = await store.get("s1")
+        deleted = await store.delete("s1")
+        return record, deleted, await store.get("s1"), await store.delete("s1")
+
+    record, deleted, after, deleted_again = asyncio.run(run())
+
+    assert contents(record) == ["q0", "a0"]
+    assert record["created_at"] == "2024-01-01T00:00:00"
+    assert deleted and after is None and not deleted_again
+
+
+def test_sqlite_appends_from_two_workers_are_not_lost(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    workers = [SQLiteSessionStore(path), SQLiteSessionStore(path)]
+
+    async def run():
+        await asyncio.gather(*(workers[n % 2].append("s1", turn(n)) for n in range(8)))
+        return await workers[0].get("s1")
+
+    assert len(contents(asyncio.run(run()))) == 16
+    for worker in workers:
+        asyncio.run(worker.close())
+
+
+def test_memory_store_expires_and_evicts():
+    async def run():
+        expired = MemorySessionStore(ttl=-1)
+        await expired.append("s1", turn(0))
+
+        small = MemorySessionStore(max_sessions=2)
+        for session_id in ("s1", "s2", "s3"):
+            await small.append(session_id, turn(0))
+        return await expired.get("s1"), await small.keys()
+
+    expired_record, keys = asyncio.run(run())
+
+    assert expired_record is None
+    assert keys == ["s2", "s3"]
+
+
+def test_incomplete_backend_fails_on_construction():
+    class GetOnlyStore(SessionStore):
+        async def get(self, session_id):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyStore()